@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import logging
+
+class BaseScraper:
+    """Hooks the runner sets on every scraper, and the parse dispatch that uses them"""
+
+    def __init__(self, spec=None):
+        self.spec = spec  # This bank's ScraperSpec; None when only parsing
+        self.url = self._spec_url()
+        self.timeout = None  # Set by the runner in deadline-aware mode
+        self.parse_pool = None  # Set by the runner to parse in worker processes
+        self.content_cache = None  # Set by the runner to skip parsing identical content
+
+    @classmethod
+    def from_registry(cls, bank):
+        """A scraper for ``bank`` built from scrapers.json, for running one scraper on its own"""
+        from registry import ScraperRegistry
+
+        return cls(ScraperRegistry().get(bank))
+
+    def _spec_url(self):
+        """Page URL from the spec: this bank's url_key in scrapers.json, looked up in bank_urls.json"""
+        if self.spec is None:
+            return None
+        try:
+            url = self.spec.url()
+        except Exception as e:
+            logging.error(f"Error loading bank URLs: {str(e)}")
+            return None
+        if not url:
+            logging.error(f"URL for {self.spec.name} not found in bank_urls.json")
+        return url
+
+    def _parse(self, method, content, worker=True):
+        """``self.<method>(content)``, skipped when the content is unchanged.
+
+        Otherwise runs in the parse pool when there is one; ``worker=False``
+        keeps inputs too small to be worth a worker process in this one.
+        """
+        parse_pool = self.parse_pool if worker else None
+        if self.content_cache:
+            return self.content_cache.parse(self, method, content, parse_pool)
+        if parse_pool:
+            return parse_pool.parse(self, method, content)
+        return getattr(self, method)(content)
+
+    async def _parse_async(self, method, content):
+        """Like _parse, but awaits the parse pool without blocking the event loop"""
+        if self.content_cache:
+            return await self.content_cache.parse_async(self, method, content, self.parse_pool)
+        if self.parse_pool:
+            return await self.parse_pool.parse_async(self, method, content)
+        return getattr(self, method)(content)
+
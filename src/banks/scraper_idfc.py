@@ -1,50 +1,22 @@
 #!/usr/bin/env python3
-import requests
-from bs4 import BeautifulSoup
 import logging
-import json
-import os
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-import time
-
-class IDFCScraper:
-    def __init__(self):
+
+from banks.base import BaseScraper
+
+class IDFCScraper(BaseScraper):
+    def __init__(self, spec=None):
+        super().__init__(spec)
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         }
-        self.url = self._get_url()
         self.driver = None
         self._driver_owned = False
 
-    def _get_url(self):
-        try:
-            json_path = os.path.join(os.path.dirname(__file__), '../bank_urls.json')
-            with open(json_path, 'r', encoding='utf-8') as file:
-                urls = json.load(file)
-                return urls.get("idfc")
-        except Exception as e:
-            logging.error(f"Error loading bank URLs: {str(e)}")
-            return None
-
     def setup_driver(self):
+        from driver_pool import create_chrome_driver
+
         if not self.driver:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless=new')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.set_page_load_timeout(30)
+            self.driver = create_chrome_driver(page_load_timeout=30)
             self._driver_owned = True
 
     def cleanup(self):
@@ -56,7 +28,30 @@ class IDFCScraper:
             self.driver = None
             self._driver_owned = False
 
+    def parse_rate(self, html):
+        """Extract the USD TT buy rate from the rendered page source"""
+        from table_spec import table_spec_for
+
+        # Table layout lives in the 'idfc' entry of scrapers.json
+        return table_spec_for('idfc').rate_record(html, 'IDFC First Bank')
+
+    def parse_rows(self, rows_json):
+        """Extract the USD TT buy rate from the rows returned by the table spec's script"""
+        from table_spec import table_spec_for
+
+        return table_spec_for('idfc').rows_record(rows_json, 'IDFC First Bank')
+
+    def ready_condition(self):
+        """The page is ready once a rate table from scrapers.json shows a numeric USD TT buy rate"""
+        from table_spec import table_spec_for
+
+        return table_spec_for('idfc').ready_condition()
+
     def get_rate(self):
+        from readiness import load_until_ready
+        from table_spec import table_spec_for
+        from selenium.common.exceptions import TimeoutException
+
         if not self.url:
             logging.error("No URL configured for IDFC")
             return None
@@ -67,68 +62,24 @@ class IDFCScraper:
                 logging.error("No webdriver available")
                 return None
 
-            logging.info("IDFC: Loading URL...")
-            self.driver.get(self.url)
-
-            # First wait for page to load
-            wait = WebDriverWait(self.driver, 15)
             try:
-                logging.info("IDFC: Waiting for page load...")
-                # Wait for any table to appear
-                table = wait.until(EC.presence_of_element_located((By.TAG_NAME, "table")))
-                # Give extra time for dynamic content
-                time.sleep(5)
+                logging.info("IDFC: Loading URL and waiting for the rates...")
+                # The rates are filled in by script after the table appears,
+                # so wait for the USD row rather than the table itself
+                load_until_ready(self.driver, self.url, self.ready_condition(), self.timeout, ready_timeout=15)
                 logging.info("IDFC: Page loaded")
             except TimeoutException:
                 logging.error("IDFC: Timeout waiting for page load")
                 return None
 
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-
-            # Find all tables and look for one with USD rate
-            tables = soup.find_all('table')
-            logging.info(f"IDFC: Found {len(tables)} tables")
-
-            for table in tables:
-                # Log table classes to help debug
-                logging.info(f"IDFC: Table classes: {table.get('class', [])}")
-
-                rows = table.find_all('tr')
-                logging.info(f"IDFC: Table has {len(rows)} rows")
-
-                # Log first row to see structure
-                if rows:
-                    first_row = rows[0].get_text().strip()
-                    logging.info(f"IDFC: First row content: {first_row}")
-
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    cell_texts = [cell.get_text().strip() for cell in cells]
-                    logging.info(f"IDFC: Row content: {cell_texts}")
-
-                    if len(cells) >= 5 and any('USD' in cell.get_text() for cell in cells):
-                        try:
-                            # Try different column indices
-                            for i in [3, 4]:
-                                try:
-                                    rate_text = cells[i].get_text().strip()
-                                    logging.info(f"IDFC: Trying column {i}: {rate_text}")
-                                    tt_buy_rate = float(rate_text.replace(',', ''))
-                                    logging.info(f"IDFC: Found USD rate: {tt_buy_rate}")
-                                    return {
-                                        'bank': 'IDFC First Bank',
-                                        'tt_buy_rate': tt_buy_rate,
-                                        'timestamp': datetime.now().isoformat()
-                                    }
-                                except (ValueError, IndexError):
-                                    continue
-
-                        except Exception as e:
-                            logging.error(f"IDFC: Error parsing rate: {str(e)}")
-                            continue
-
-            logging.error("IDFC: Could not find USD rate in any table")
-            return None
+            # The browser returns only the rate tables' cell texts as JSON, not the page's HTML
+            rows_json = table_spec_for('idfc').browser_rows(self.driver)
+            if rows_json:
+                return self._parse('parse_rows', rows_json, worker=False)
+
+            # No table matched the spec's selector: parse the full page source
+            html = self.driver.page_source
+            return self._parse('parse_rate', html)
 
         except Exception as e:
             logging.error(f"IDFC: Error in scraper: {str(e)}")
@@ -144,7 +95,7 @@ if __name__ == "__main__":
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
-    scraper = IDFCScraper()
+    scraper = IDFCScraper.from_registry('idfc')
     rate = scraper.get_rate()
     if rate:
         print(f"Extracted rate: {rate['tt_buy_rate']}")
@@ -1,153 +1,303 @@
 #!/usr/bin/env python3
-import requests
 import json
 import logging
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-from PyPDF2 import PdfReader
-import io
 import re
 from datetime import datetime
+from functools import partial
 import os
 
+from banks.base import BaseScraper
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-class SBIScraper:
-    def __init__(self):
-        self.url = "https://sbi.co.in/"
-        logging.info("Initializing SBI Scraper")
+STATE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'sbi_state.json')
 
-    def get_latest_forex_pdf_url(self):
-        try:
-            logging.info("Fetching SBI homepage to find forex rates PDF link...")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            }
-            response = requests.get(self.url, headers=headers)
-            response.raise_for_status()
+# The rates PDF is a few hundred KB; anything far larger is not the rate sheet
+MAX_PDF_BYTES = 5 * 1024 * 1024
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            logging.info("Parsing SBI homepage for forex PDF link...")
+# One row per currency, e.g. "UNITED STATES DOLLAR USD/INR 83.12 84.00 ...",
+# with the figures in the sheet's column order
+RATE_ROW = re.compile(r'\b([A-Z]{3})/INR\s+([0-9]+(?:\.[0-9]+)?(?:[ \t]+[0-9]+(?:\.[0-9]+)?)*)', re.IGNORECASE)
+RATE_COLUMNS = ('tt_buy', 'tt_sell', 'bill_buy', 'bill_sell', 'card_buy', 'card_sell', 'cash_buy', 'cash_sell')
 
-            for link in soup.find_all('a', href=True):
-                if "FOREX CARD RATES" in link.text.upper():
-                    pdf_url = urljoin(self.url, link['href'])
-                    logging.info(f"Found forex PDF URL: {pdf_url}")
-                    return pdf_url
+# The sheet's header, e.g. "Date: 17-10-2026" or "DATE 17/10/2026"
+SHEET_DATE = re.compile(r'\bDATE\b\W*(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})', re.IGNORECASE)
 
-            raise Exception("Could not find Forex rates PDF link on SBI website")
+class SBIScraper(BaseScraper):
+    def __init__(self, spec=None):
+        super().__init__(spec)
+        self.http_cache = None  # Set by the runner to skip an unchanged homepage and PDF
+        self.state = self._load_state()  # Last PDF URL and the page holding the USD row
+        self.rates = {}  # Every currency's TT buy rate from the last parsed PDF
+        self.rate_types = {}  # Every column (TT, bill, card, cash) per currency
+        self.pdf_backend, self.pdf_bbox = self._load_pdf_options()
+        logging.info("Initializing SBI Scraper")
 
-        except Exception as e:
-            logging.error(f"Error fetching latest URL: {str(e)}")
+    def _homepage_headers(self):
+        return {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        }
+
+    def _pdf_headers(self):
+        return {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'application/pdf',
+            'Referer': 'https://sbi.co.in/'
+        }
+
+    def find_forex_pdf_url(self, html):
+        """Find the FOREX CARD RATES PDF link on the SBI homepage"""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+        logging.info("Parsing SBI homepage for forex PDF link...")
+
+        for link in soup.find_all('a', href=True):
+            if "FOREX CARD RATES" in link.text.upper():
+                pdf_url = urljoin(self.url, link['href'])
+                logging.info(f"Found forex PDF URL: {pdf_url}")
+                return pdf_url
+
+        raise Exception("Could not find Forex rates PDF link on SBI website")
+
+    def sheet_date(self, pdf, text):
+        """The date printed on the rate sheet (YYYY-MM-DD), or None when it has none"""
+        match = SHEET_DATE.search(text)
+        if not match and self.pdf_bbox:
+            # The bounding box may cut off the header
+            match = SHEET_DATE.search(pdf.page_text(0))
+        if not match:
             return None
-
-    def extract_tt_buy_rate_from_pdf(self, url):
+        day, month, year = (int(part) for part in match.groups())
         try:
-            logging.info("Downloading forex rates PDF...")
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/pdf',
-                'Referer': 'https://sbi.co.in/'
+            return datetime(year, month, day).strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+
+    def parse_rates(self, pdf_content):
+        """Extract every currency's rates, and the sheet's date, from the PDF bytes.
+
+        The page that carried the USD row last time is read first, and all
+        rows on the matching page are collected in one regex pass, so
+        usually only one page is ever extracted.
+        """
+        from pdf_backends import open_pdf
+
+        if not pdf_content:
+            raise Exception("PDF content is empty")
+
+        logging.info(f"Parsing PDF content with {self.pdf_backend}...")
+        pdf = open_pdf(pdf_content, self.pdf_backend)
+        page_count = pdf.page_count
+
+        hint = self.state.get('usd_page')
+        order = list(range(page_count))
+        if isinstance(hint, int) and 0 <= hint < page_count:
+            order.remove(hint)
+            order.insert(0, hint)
+
+        for page_num in order:
+            logging.info(f"Scanning page {page_num + 1} for USD rate...")
+            text = pdf.page_text(page_num, self.pdf_bbox)
+            rate_types = {
+                code.upper(): dict(zip(RATE_COLUMNS, (float(value) for value in values.split())))
+                for code, values in RATE_ROW.findall(text)
             }
+            if 'USD' in rate_types:
+                logging.info(f"Found rates for {len(rate_types)} currencies on page {page_num + 1}")
+                return {
+                    'rates': {code: columns['tt_buy'] for code, columns in rate_types.items()},
+                    'rate_types': rate_types,
+                    'page': page_num,
+                    'date': self.sheet_date(pdf, text),
+                }
+
+        raise Exception("Could not find TT Buy rate in PDF")
+
+    def parse_tt_buy_rate(self, pdf_content):
+        """Extract the USD TT buy rate from the downloaded PDF bytes"""
+        tt_buy_rate = self.parse_rates(pdf_content)['rates']['USD']
+        logging.info(f"Found TT Buy rate: {tt_buy_rate}")
+        return tt_buy_rate
+
+    def _load_pdf_options(self):
+        """PDF backend and optional table bounding box from the sbi entry in scrapers.json"""
+        options = self.spec.options if self.spec else {}
+        return options.get('pdf_backend', 'pypdf2'), options.get('pdf_bbox')
+
+    def _load_state(self):
+        try:
+            if os.path.exists(STATE_PATH):
+                with open(STATE_PATH, 'r', encoding='utf-8') as file:
+                    return json.load(file)
+        except Exception as e:
+            logging.warning(f"Could not read SBI state, starting fresh: {str(e)}")
+        return {}
+
+    def _remember(self, pdf_url, page, confirmed):
+        """Persist the PDF URL and the page holding the USD row for the next run"""
+        state = dict(self.state, pdf_url=pdf_url, usd_page=page)
+        if confirmed:
+            state['url_checked'] = datetime.now().strftime('%Y-%m-%d')
+        if state == self.state:
+            return
+        self.state = state
+        try:
+            with open(STATE_PATH, 'w', encoding='utf-8') as file:
+                json.dump(state, file, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving SBI state: {str(e)}")
 
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
+    def is_current(self, parsed):
+        """Whether a PDF parsed from the stored URL can be used without asking the homepage.
 
-            if not response.content:
-                raise Exception("PDF content is empty")
+        SBI may move the sheet and leave a stale PDF at the old URL, so it
+        must be dated today, or the homepage must have linked to it today.
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        return parsed.get('date') == today or self.state.get('url_checked') == today
 
-            logging.info("Parsing PDF content...")
-            pdf_bytes = io.BytesIO(response.content)
-            pdf_reader = PdfReader(pdf_bytes)
+    def get_latest_forex_pdf_url(self):
+        """The homepage's current PDF link; with the HTTP cache an unchanged homepage is a 304"""
+        import requests
 
-            for page_num, page in enumerate(pdf_reader.pages):
-                logging.info(f"Scanning page {page_num + 1} for USD rate...")
-                text = page.extract_text()
-                match = re.search(r'UNITED STATES DOLLAR\s+USD/INR\s+([0-9.]+)', text, re.IGNORECASE)
-                if match:
-                    tt_buy_rate = float(match.group(1))
-                    logging.info(f"Found TT Buy rate: {tt_buy_rate}")
-                    return tt_buy_rate
+        try:
+            logging.info("Fetching SBI homepage to find forex rates PDF link...")
+            if self.http_cache:
+                return self.http_cache.fetch(self.url, partial(self._parse, 'find_forex_pdf_url'),
+                                             'find_forex_pdf_url', headers=self._homepage_headers(),
+                                             timeout=self.timeout or 30)
 
-            raise Exception("Could not find TT Buy rate in PDF")
+            response = requests.get(self.url, headers=self._homepage_headers(), timeout=self.timeout or 30)
+            response.raise_for_status()
+            return self._parse('find_forex_pdf_url', response.text)
 
         except Exception as e:
-            logging.error(f"Error extracting rate from PDF: {str(e)}")
+            logging.error(f"Error fetching latest URL: {str(e)}")
             return None
 
+    def fetch_rates(self, url):
+        """Stream the PDF (capped at MAX_PDF_BYTES) and parse every currency row"""
+        import requests
+        from http_cache import read_capped
+
+        logging.info("Downloading forex rates PDF...")
+        if self.http_cache:
+            return self.http_cache.fetch(url, partial(self._parse, 'parse_rates'), 'parse_rates',
+                                         headers=self._pdf_headers(), timeout=self.timeout or 30,
+                                         max_bytes=MAX_PDF_BYTES)
+
+        response = requests.get(url, headers=self._pdf_headers(), timeout=self.timeout or 30, stream=True)
+        response.raise_for_status()
+        pdf_content = read_capped(response.iter_content(64 * 1024), MAX_PDF_BYTES,
+                                  response.headers.get('Content-Length'))
+        return self._parse('parse_rates', pdf_content)
+
+    def build_rate(self, tt_buy_rate):
+        # Get current timestamp in UTC
+        timestamp = datetime.utcnow().isoformat() + "Z"
+
+        rate_data = {
+            'bank': 'SBI',  # Note: Using uppercase 'SBI' to match existing entries
+            'tt_buy_rate': tt_buy_rate,
+            'currencies': self.rate_types,
+            'timestamp': timestamp
+        }
+
+        logging.info(f"Successfully scraped SBI rate: {tt_buy_rate} ({len(self.rate_types)} currencies)")
+        return rate_data
+
+    def _finish(self, pdf_url, parsed, confirmed):
+        self._remember(pdf_url, parsed['page'], confirmed)
+        self.rates = parsed['rates']
+        self.rate_types = parsed.get('rate_types', {})
+        return self.build_rate(parsed['rates']['USD'])
+
     def get_rate(self):
         """Main method called by the scraper framework"""
         try:
             logging.info("Starting SBI rate scraping process...")
 
-            pdf_url = self.get_latest_forex_pdf_url()
-            if not pdf_url:
+            # Try the stored PDF first; the homepage is only needed when it is not today's sheet
+            pdf_url, parsed = self.state.get('pdf_url'), None
+            if pdf_url:
+                try:
+                    parsed = self.fetch_rates(pdf_url)
+                except Exception as e:
+                    logging.warning(f"Stored SBI PDF URL failed ({str(e)}), checking the homepage")
+                if parsed and self.is_current(parsed):
+                    return self._finish(pdf_url, parsed, confirmed=False)
+
+            latest = self.get_latest_forex_pdf_url()
+            if not latest:
                 raise Exception("Could not get PDF URL")
-
-            tt_buy_rate = self.extract_tt_buy_rate_from_pdf(pdf_url)
-            if tt_buy_rate is None:
-                raise Exception("Could not extract TT buy rate from PDF")
-
-            # Get current timestamp in UTC
-            timestamp = datetime.utcnow().isoformat() + "Z"
-
-            rate_data = {
-                'bank': 'SBI',  # Note: Using uppercase 'SBI' to match existing entries
-                'tt_buy_rate': tt_buy_rate,
-                'timestamp': timestamp
-            }
-
-            logging.info(f"Successfully scraped SBI rate: {rate_data}")
-
-            # Update existing entry if present
-            self.update_existing_entry(rate_data)
-
-            return rate_data
+            if latest != pdf_url or not parsed:
+                parsed = self.fetch_rates(latest)
+            return self._finish(latest, parsed, confirmed=True)
 
         except Exception as e:
             logging.error(f"Error in SBI scraper: {str(e)}")
             return None
 
-    def update_existing_entry(self, rate_data):
-        """Update existing entry in all_banks_data.json if present"""
-        try:
-            json_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'all_banks_data.json')
-
-            if not os.path.exists(json_path):
-                logging.info("all_banks_data.json does not exist yet")
-                return
+    async def _fetch_rates_async(self, engine, url):
+        logging.info("Downloading forex rates PDF...")
+        if self.http_cache:
+            return await self.http_cache.fetch_async(
+                engine, url, partial(self._parse_async, 'parse_rates'), 'parse_rates',
+                headers=self._pdf_headers(), timeout=self.timeout or 30, max_bytes=MAX_PDF_BYTES
+            )
 
-            with open(json_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
+        response, pdf_content = await engine.download(url, MAX_PDF_BYTES, headers=self._pdf_headers(),
+                                                      timeout=self.timeout or 30)
+        response.raise_for_status()
+        return await self._parse_async('parse_rates', pdf_content)
 
-            current_date = datetime.now().strftime('%Y-%m-%d')
+    async def get_rate_async(self, engine):
+        """Same as get_rate, but both round-trips reuse the shared HttpEngine connection.
 
-            # Find today's entry
-            for entry in data['historical_data']:
-                if entry['date'] == current_date:
-                    # Find and update SBI entry
-                    for rate in entry['rates']:
-                        if rate['bank'].upper() == 'SBI':
-                            logging.info(f"Updating existing SBI entry for {current_date}")
-                            rate.update(rate_data)
+        Timeouts and connection errors propagate so the runner's retry policy
+        can tell them apart from a page we failed to parse.
+        """
+        from retry import classify_failure
 
-                            # Save updated data
-                            with open(json_path, 'w', encoding='utf-8') as file:
-                                json.dump(data, file, indent=2)
-                            return
-
-            logging.info("No existing SBI entry found for today")
+        logging.info("Starting SBI rate scraping process...")
 
+        try:
+            pdf_url, parsed = self.state.get('pdf_url'), None
+            if pdf_url:
+                try:
+                    parsed = await self._fetch_rates_async(engine, pdf_url)
+                except Exception as e:
+                    logging.warning(f"Stored SBI PDF URL failed ({str(e)}), checking the homepage")
+                if parsed and self.is_current(parsed):
+                    return self._finish(pdf_url, parsed, confirmed=False)
+
+            if self.http_cache:
+                latest = await self.http_cache.fetch_async(
+                    engine, self.url, partial(self._parse_async, 'find_forex_pdf_url'),
+                    'find_forex_pdf_url', headers=self._homepage_headers(), timeout=self.timeout or 30
+                )
+            else:
+                response = await engine.get(self.url, headers=self._homepage_headers(), timeout=self.timeout or 30)
+                response.raise_for_status()
+                latest = await self._parse_async('find_forex_pdf_url', response.text)
+            if latest != pdf_url or not parsed:
+                parsed = await self._fetch_rates_async(engine, latest)
+            return self._finish(latest, parsed, confirmed=True)
         except Exception as e:
-            logging.error(f"Error updating existing entry: {str(e)}")
+            if classify_failure(e) in ('timeout', 'network'):
+                raise
+            logging.error(f"Error in SBI scraper: {str(e)}")
+            return None
 
 if __name__ == "__main__":
     # When run individually, execute and show results
-    scraper = SBIScraper()
+    scraper = SBIScraper.from_registry('sbi')
     result = scraper.get_rate()
     if result:
         print("\nSuccessfully scraped SBI rate:")
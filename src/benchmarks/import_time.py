@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Import-time budget check.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and fails if its cumulative import time exceeds the budget, or if importing
+it pulls in one of the heavy scraping dependencies, which must only be
+loaded on first use.
+
+    python src/benchmarks/import_time.py [--budget-ms 50] [--repeat 3]
+
+Each module is measured ``--repeat`` times and the fastest run is kept, so
+a single slow filesystem read does not fail the check.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    'run_all_scrapers',
+    'registry',
+    'scheduler',
+    'deadline',
+    'retry',
+    'readiness',
+    'direct_endpoint',
+    'http_cache',
+    'content_cache',
+    'pdf_backends',
+    'html_tables',
+    'table_spec',
+    'selector_cache',
+    'rate_store',
+    'rate_journal',
+    'sqlite_store',
+    'columnar_store',
+    'retention',
+    'persistence',
+    'banks.scraper_sbi',
+    'banks.scraper_canara',
+    'banks.scraper_hsbc',
+    'banks.scraper_icici',
+    'banks.scraper_yes',
+    'banks.scraper_kotak',
+    'banks.scraper_iob',
+    'banks.scraper_idfc',
+    'banks.scraper_bob',
+    'banks.scraper_boi',
+]
+
+HEAVY_MODULES = ('selenium', 'bs4', 'lxml', 'PyPDF2', 'pypdfium2', 'pdfminer', 'rich', 'requests', 'httpx')
+
+def measure(module):
+    """Return (cumulative import time in ms, heavy modules loaded) for one module"""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    cumulative_us = None
+    heavy = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line.split(':', 1)[1].split('|')]
+        if not cumulative.isdigit():
+            continue
+        if name == module:
+            cumulative_us = int(cumulative)
+        if name.split('.')[0] in HEAVY_MODULES:
+            heavy.add(name.split('.')[0])
+
+    return (cumulative_us or 0) / 1000, sorted(heavy)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--budget-ms', type=float, default=50.0,
+                        help="Maximum cumulative import time per module (default: 50ms)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Runs per module; the fastest is reported (default: 3)")
+    args = parser.parse_args()
+
+    failures = 0
+    for module in MODULES:
+        runs = [measure(module) for _ in range(max(1, args.repeat))]
+        elapsed_ms = min(elapsed for elapsed, _ in runs)
+        heavy = sorted(set().union(*(set(loaded) for _, loaded in runs)))
+        status = "OK"
+        if elapsed_ms > args.budget_ms:
+            status = "OVER BUDGET"
+        if heavy:
+            status = f"EAGER IMPORT ({', '.join(heavy)})"
+        if status != "OK":
+            failures += 1
+        print(f"{module:<25} {elapsed_ms:8.1f} ms  {status}")
+
+    if failures:
+        print(f"\n{failures} module(s) failed the {args.budget_ms:.0f}ms import budget")
+        sys.exit(1)
+    print(f"\nAll modules within the {args.budget_ms:.0f}ms import budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""PDF backend benchmark on archived SBI rate sheets.
+
+Runs SBIScraper.parse_rates with every installed backend over each
+archived PDF and reports the fastest time per backend, and whether its
+rates match the pypdf2 baseline. The archive is filled with --download.
+
+    python src/benchmarks/pdf_backends.py [--download] [--repeat 5] [PDF ...]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from datetime import datetime
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sbi_pdfs')
+
+sys.path.insert(0, SRC_DIR)
+
+def download_current_pdf(scraper):
+    """Save today's SBI rate sheet into the archive"""
+    import requests
+
+    pdf_url = scraper.get_latest_forex_pdf_url()
+    if not pdf_url:
+        raise RuntimeError("Could not find the SBI forex PDF link")
+    response = requests.get(pdf_url, headers=scraper._pdf_headers(), timeout=30)
+    response.raise_for_status()
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    path = os.path.join(ARCHIVE_DIR, f"{datetime.now().strftime('%Y-%m-%d')}.pdf")
+    with open(path, 'wb') as file:
+        file.write(response.content)
+    print(f"Saved {pdf_url} to {path}")
+
+def measure(scraper, backend, pdf_content, repeat):
+    """Return (fastest parse in ms, parsed rates) for one backend and PDF"""
+    scraper.pdf_backend = backend
+    timings = []
+    parsed = None
+    for _ in range(repeat):
+        # Always scan from the first page so backends do the same work
+        scraper.state = {}
+        started = time.perf_counter()
+        parsed = scraper.parse_rates(pdf_content)
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), parsed['rate_types']
+
+def main():
+    import logging
+    from banks.scraper_sbi import SBIScraper
+    from pdf_backends import DEFAULT_BACKEND, available_backends
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pdfs', nargs='*', help=f"PDF files (default: {ARCHIVE_DIR}/*.pdf)")
+    parser.add_argument('--download', action='store_true', help="Archive today's SBI PDF first")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Runs per backend and PDF; the fastest is reported (default: 5)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    scraper = SBIScraper.from_registry('sbi')
+    if args.download:
+        download_current_pdf(scraper)
+
+    paths = args.pdfs or sorted(glob.glob(os.path.join(ARCHIVE_DIR, '*.pdf')))
+    if not paths:
+        parser.error("no PDFs to benchmark; pass paths or run with --download")
+
+    backends = available_backends()
+    print(f"{'PDF':<30} " + ' '.join(f"{backend:>12}" for backend in backends))
+    totals = {backend: 0.0 for backend in backends}
+    mismatches = []
+    for path in paths:
+        with open(path, 'rb') as file:
+            pdf_content = file.read()
+
+        results = {}
+        for backend in backends:
+            try:
+                results[backend] = measure(scraper, backend, pdf_content, max(1, args.repeat))
+                totals[backend] += results[backend][0]
+            except Exception as e:
+                results[backend] = (None, None)
+                mismatches.append(f"{os.path.basename(path)}: {backend} failed ({str(e)})")
+
+        baseline = results.get(DEFAULT_BACKEND, (None, None))[1]
+        for backend, (_, rates) in results.items():
+            if rates is not None and baseline is not None and rates != baseline:
+                mismatches.append(f"{os.path.basename(path)}: {backend} rates differ from {DEFAULT_BACKEND}")
+
+        cells = [f"{elapsed:10.1f}ms" if elapsed is not None else f"{'failed':>12}"
+                 for elapsed, _ in results.values()]
+        print(f"{os.path.basename(path):<30} " + ' '.join(cells))
+
+    print(f"{'total':<30} " + ' '.join(f"{totals[backend]:10.1f}ms" for backend in backends))
+    if mismatches:
+        print("\n" + "\n".join(mismatches))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
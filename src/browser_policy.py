@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import json
+import logging
+import os
+import threading
+
+METRICS_PATH = os.path.join(os.path.dirname(__file__), 'browser_metrics.json')
+
+# Network.setBlockedURLs only matches URL patterns, so resource types are
+# expressed as the file extensions they are served with
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.ttf*', '*.otf*', '*.eot*'],
+    'stylesheet': ['*.css*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*'],
+}
+
+DEFAULT_BLOCK_TYPES = ['image', 'font', 'stylesheet', 'media']
+
+# Analytics, ad and chat-widget hosts seen on the bank pages
+DEFAULT_BLOCK_URLS = [
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*facebook.net*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*adobedtm.com*',
+    '*demdex.net*',
+    '*omtrdc.net*',
+    '*tawk.to*',
+    '*haptik.ai*',
+    '*youtube.com*',
+]
+
+class ResourcePolicy:
+    """Per-bank list of resources Chrome should not download"""
+
+    def __init__(self, block_types=None, block_urls=None):
+        self.block_types = DEFAULT_BLOCK_TYPES if block_types is None else block_types
+        self.block_urls = DEFAULT_BLOCK_URLS if block_urls is None else block_urls
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a policy from a scrapers.json ``resource_policy`` entry.
+
+        A missing entry means the defaults; ``false`` disables blocking.
+        """
+        if config is False:
+            return None
+        config = config or {}
+        return cls(config.get('block_types'), config.get('block_urls'))
+
+    def patterns(self):
+        patterns = list(self.block_urls)
+        for resource_type in self.block_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        return patterns
+
+    def apply(self, driver):
+        # Drain performance log entries left over from the previous lease
+        driver.get_log('performance')
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns()})
+
+def collect_network_stats(driver):
+    """Summarise the network activity recorded since the policy was applied"""
+    stats = {'requests': 0, 'blocked_requests': 0, 'bytes_loaded': 0}
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+
+        method = message.get('method')
+        params = message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            stats['requests'] += 1
+        elif method == 'Network.loadingFinished':
+            stats['bytes_loaded'] += int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+            stats['blocked_requests'] += 1
+    return stats
+
+class BrowserMetrics:
+    """Bytes downloaded per bank with and without resource blocking.
+
+    The latest figure for each mode is persisted, so once a bank has been
+    scraped both ways (``--no-resource-blocking`` for the baseline) every
+    later run can report how many bytes blocking saves.
+    """
+
+    def __init__(self, path=METRICS_PATH):
+        self.path = path
+        self.data = {}
+        self._lock = threading.Lock()
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self.data = json.load(file)
+        except Exception as e:
+            logging.warning(f"Could not read browser metrics, starting fresh: {str(e)}")
+
+    def record(self, bank, stats, blocked):
+        mode = 'blocked' if blocked else 'unblocked'
+        with self._lock:
+            entry = self.data.setdefault(bank, {})
+            entry[mode] = stats
+            saved = self.bytes_saved(bank)
+
+        message = (f"{bank}: {stats['requests']} requests, {stats['blocked_requests']} blocked, "
+                   f"{stats['bytes_loaded'] / 1024:.0f} KiB loaded")
+        if saved is not None:
+            message += f", {saved / 1024:.0f} KiB saved vs. unblocked baseline"
+        logging.info(message)
+
+    def bytes_saved(self, bank):
+        entry = self.data.get(bank, {})
+        if 'blocked' not in entry or 'unblocked' not in entry:
+            return None
+        return entry['unblocked']['bytes_loaded'] - entry['blocked']['bytes_loaded']
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump(self.data, file, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving browser metrics: {str(e)}")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Columnar, memory-mapped rate store.
+
+Rates are flattened to one row per (date, bank, currency, rate type) and
+kept as fixed-width binary columns, one directory per month:
+
+    rate_columns/dictionary.json        bank / currency / rate type names
+    rate_columns/2026-10/date.bin       int32 days since 1970-01-01
+    rate_columns/2026-10/timestamp.bin  int64 wall-clock microseconds since 1970-01-01
+    rate_columns/2026-10/utc_offset.bin int16 minutes, or a code for naive / "Z" timestamps
+    rate_columns/2026-10/bank.bin       uint16 dictionary code
+    rate_columns/2026-10/currency.bin   uint16 dictionary code
+    rate_columns/2026-10/rate_type.bin  uint8 dictionary code
+    rate_columns/2026-10/rate.bin       float64
+
+Writes only append to the current month's files. Reads memory-map the
+files, as NumPy arrays when NumPy is installed and as typed memoryviews
+otherwise, so a year of history is scanned without parsing any JSON.
+Rows are never rewritten: a later row for the same rate wins on read.
+Timestamps read back exactly as the scrapers wrote them.
+
+    python src/columnar_store.py import   # load the journal and all_banks_data.json
+    python src/columnar_store.py export   # rewrite all_banks_data.json from the columns
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+from array import array
+from datetime import date, datetime, timedelta, timezone
+
+from rate_store import (SNAPSHOT_DAYS, SNAPSHOT_PATH, RateStore, history_records, record_rows, records_from_rows,
+                        snapshot_from_rows, write_json_atomic)
+
+COLUMNS_DIR = os.path.join(os.path.dirname(__file__), 'rate_columns')
+
+# Column name -> array/NumPy typecode; native byte order, as written by array.tofile
+COLUMNS = {
+    'date': 'i',
+    'timestamp': 'q',
+    'utc_offset': 'h',
+    'bank': 'H',
+    'currency': 'H',
+    'rate_type': 'B',
+    'rate': 'd',
+}
+DICTIONARY_COLUMNS = ('bank', 'currency', 'rate_type')
+SCAN_COLUMNS = ('date', 'timestamp', 'utc_offset', 'bank', 'rate')
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+EPOCH = datetime(1970, 1, 1)
+
+# utc_offset codes for timestamps without a numeric offset
+NAIVE_OFFSET = -32768   # local time, as datetime.now().isoformat() writes it
+UTC_Z = 32767           # UTC with a trailing "Z", as the SBI scraper writes it
+
+def encode_date(text):
+    return date.fromisoformat(text).toordinal() - EPOCH_ORDINAL
+
+def decode_date(days):
+    return date.fromordinal(int(days) + EPOCH_ORDINAL).isoformat()
+
+def encode_timestamp(text):
+    """``(wall-clock microseconds, utc_offset code)``; decode_timestamp turns them back into ``text``"""
+    if text.endswith('Z'):
+        moment, offset = datetime.fromisoformat(text[:-1]), UTC_Z
+    else:
+        moment = datetime.fromisoformat(text)
+        offset = NAIVE_OFFSET if moment.tzinfo is None else int(moment.utcoffset().total_seconds() // 60)
+    return (moment.replace(tzinfo=None) - EPOCH) // timedelta(microseconds=1), offset
+
+def decode_timestamp(micros, offset):
+    moment = EPOCH + timedelta(microseconds=int(micros))
+    offset = int(offset)
+    if offset == NAIVE_OFFSET:
+        return moment.isoformat()
+    if offset == UTC_Z:
+        return moment.isoformat() + 'Z'
+    return moment.replace(tzinfo=timezone(timedelta(minutes=offset))).isoformat()
+
+def _numpy():
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+class ColumnarRateStore(RateStore):
+    name = 'columnar'
+
+    def __init__(self, root=COLUMNS_DIR, snapshot_path=SNAPSHOT_PATH, snapshot_days=SNAPSHOT_DAYS):
+        self.root = root
+        self.snapshot_path = snapshot_path
+        self.snapshot_days = snapshot_days
+        self.dictionary = {column: [] for column in DICTIONARY_COLUMNS}
+        path = os.path.join(root, 'dictionary.json')
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self.dictionary.update(json.load(file))
+        self._codes = {column: {value: code for code, value in enumerate(values)}
+                       for column, values in self.dictionary.items()}
+
+    def _code(self, column, value):
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(self.dictionary[column])
+            self.dictionary[column].append(value)
+        return codes[value]
+
+    def save(self, records, date=None):
+        day = date or datetime.now().strftime('%Y-%m-%d')
+        self.save_many((day, record) for record in records)
+
+    def save_many(self, dated_records):
+        """Append ``(date, record)`` pairs to their month partitions"""
+        partitions = {}
+        known = {column: len(values) for column, values in self.dictionary.items()}
+        for day, record in dated_records:
+            columns = partitions.setdefault(day[:7], {name: array(code) for name, code in COLUMNS.items()})
+            for row_date, bank, currency, rate_type, rate, timestamp in record_rows(day, record):
+                columns['date'].append(encode_date(row_date))
+                micros, offset = encode_timestamp(timestamp)
+                columns['timestamp'].append(micros)
+                columns['utc_offset'].append(offset)
+                columns['bank'].append(self._code('bank', bank))
+                columns['currency'].append(self._code('currency', currency))
+                columns['rate_type'].append(self._code('rate_type', rate_type))
+                columns['rate'].append(float(rate))
+
+        os.makedirs(self.root, exist_ok=True)
+        # New codes must be on disk before any column refers to them
+        if any(len(values) != known[column] for column, values in self.dictionary.items()):
+            write_json_atomic(os.path.join(self.root, 'dictionary.json'), self.dictionary)
+
+        rows = 0
+        for month, columns in partitions.items():
+            directory = os.path.join(self.root, month)
+            os.makedirs(directory, exist_ok=True)
+            paths = {name: os.path.join(directory, f"{name}.bin") for name in COLUMNS}
+            # A crash between column appends leaves them at different lengths; cut every
+            # column back to the rows all of them hold so new rows line up again
+            stored = min(os.path.getsize(path) // columns[name].itemsize if os.path.exists(path) else 0
+                         for name, path in paths.items())
+            for name, values in columns.items():
+                with open(paths[name], 'ab') as file:
+                    file.truncate(stored * values.itemsize)
+                    values.tofile(file)
+                    file.flush()
+                    os.fsync(file.fileno())
+            rows += len(columns['rate'])
+        logging.info(f"Appended {rows} rates to {os.path.basename(self.root)}")
+
+    def months(self, start=None, end=None):
+        """Partition names (YYYY-MM) overlapping ``start``..``end`` (YYYY-MM-DD), oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        names = sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+        return [name for name in names if (not start or name >= start[:7]) and (not end or name <= end[:7])]
+
+    def partition(self, month):
+        """Memory-mapped columns of one month; a row half-written by a crash is cut off"""
+        numpy = _numpy()
+        columns = {}
+        for name, code in COLUMNS.items():
+            path = os.path.join(self.root, month, f"{name}.bin")
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                return {name: array(code) for name, code in COLUMNS.items()}
+            if numpy is not None:
+                dtype = numpy.dtype(code)
+                columns[name] = numpy.memmap(path, dtype=dtype, mode='r', shape=(os.path.getsize(path) // dtype.itemsize,))
+            else:
+                with open(path, 'rb') as file:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                usable = len(mapped) - len(mapped) % array(code).itemsize
+                columns[name] = memoryview(mapped)[:usable].cast(code)
+
+        rows = min(len(values) for values in columns.values())
+        return {name: values[:rows] for name, values in columns.items()}
+
+    def scan(self, start=None, end=None, bank=None, currency='USD', rate_type='tt_buy'):
+        """Yield the filtered SCAN_COLUMNS of each partition in range, as a dict per partition.
+
+        With NumPy the filter is a vectorised mask over the memory-mapped
+        arrays; without it, a loop over the typed memoryviews.
+        """
+        numpy = _numpy()
+        wanted = {
+            'currency': self._codes['currency'].get(currency),
+            'rate_type': self._codes['rate_type'].get(rate_type),
+            'bank': self._codes['bank'].get(bank) if bank else None,
+        }
+        if wanted['currency'] is None or wanted['rate_type'] is None or (bank and wanted['bank'] is None):
+            return
+        first = encode_date(start) if start else None
+        last = encode_date(end) if end else None
+
+        for month in self.months(start, end):
+            columns = self.partition(month)
+            if not len(columns['rate']):
+                continue
+            if numpy is not None:
+                mask = (columns['currency'] == wanted['currency']) & (columns['rate_type'] == wanted['rate_type'])
+                if bank:
+                    mask &= columns['bank'] == wanted['bank']
+                if first is not None:
+                    mask &= columns['date'] >= first
+                if last is not None:
+                    mask &= columns['date'] <= last
+                yield {name: columns[name][mask] for name in SCAN_COLUMNS}
+            else:
+                rows = [
+                    i for i in range(len(columns['rate']))
+                    if columns['currency'][i] == wanted['currency'] and columns['rate_type'][i] == wanted['rate_type']
+                    and (not bank or columns['bank'][i] == wanted['bank'])
+                    and (first is None or columns['date'][i] >= first)
+                    and (last is None or columns['date'][i] <= last)
+                ]
+                yield {name: [columns[name][i] for i in rows] for name in SCAN_COLUMNS}
+
+    def history(self, bank=None, currency='USD', rate_type='tt_buy', start=None, end=None):
+        """``(date, bank, rate, timestamp)`` per day and bank, oldest first, like SQLiteRateStore.history"""
+        latest = {}
+        for columns in self.scan(start, end, bank, currency, rate_type):
+            for day, micros, offset, bank_code, rate in zip(*(columns[name] for name in SCAN_COLUMNS)):
+                latest[(int(day), int(bank_code))] = (float(rate), decode_timestamp(micros, offset))
+        banks = self.dictionary['bank']
+        return [
+            (decode_date(day), banks[bank_code], rate, timestamp)
+            for (day, bank_code), (rate, timestamp) in sorted(latest.items(), key=lambda item: (item[0][0], banks[item[0][1]]))
+        ]
+
+    def rows(self, start=None):
+        """Every stored row from ``start`` (YYYY-MM-DD) on, decoded, in write order"""
+        first = encode_date(start) if start else None
+        names = {column: self.dictionary[column] for column in DICTIONARY_COLUMNS}
+        for month in self.months(start):
+            columns = self.partition(month)
+            for i in range(len(columns['rate'])):
+                if first is not None and columns['date'][i] < first:
+                    continue
+                yield (decode_date(columns['date'][i]), names['bank'][columns['bank'][i]],
+                       names['currency'][columns['currency'][i]], names['rate_type'][columns['rate_type'][i]],
+                       float(columns['rate'][i]), decode_timestamp(columns['timestamp'][i], columns['utc_offset'][i]))
+
+    def records(self):
+        return records_from_rows(self.rows())
+
+    def snapshot(self, days=None):
+        """The ``{"historical_data": [...]}`` structure index.html reads, newest day first"""
+        days = days or self.snapshot_days
+        # The window lives in the newest partitions; only their date columns are read to size it
+        dates = set()
+        first_month = None
+        for month in reversed(self.months()):
+            first_month = month
+            dates.update(int(day) for day in self.partition(month)['date'])
+            if len(dates) >= days:
+                break
+        if first_month is None:
+            return {"historical_data": []}
+        return snapshot_from_rows(self.rows(f"{first_month}-01"), days)
+
+    def empty(self):
+        return not any(len(self.partition(month)['rate']) for month in self.months())
+
+    def export_snapshot(self):
+        snapshot = self.snapshot()
+        if not snapshot["historical_data"]:
+            logging.warning(f"{os.path.basename(self.root)} is empty, not overwriting "
+                            f"{os.path.basename(self.snapshot_path)}; run 'python src/columnar_store.py import' first")
+            return
+        write_json_atomic(self.snapshot_path, snapshot)
+        logging.info(f"Exported {os.path.basename(self.snapshot_path)} from {os.path.basename(self.root)}")
+
+    def import_history(self):
+        """Load the dashboard snapshot, then the whole journal on top of it"""
+        self.save_many(history_records(self.snapshot_path))
+
+def main():
+    parser = argparse.ArgumentParser(description="Import rate history into rate_columns/ or export the dashboard JSON")
+    parser.add_argument('command', choices=['import', 'export'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = ColumnarRateStore()
+    if args.command == 'import':
+        store.import_history()
+    else:
+        store.export_snapshot()
+
+if __name__ == "__main__":
+    main()
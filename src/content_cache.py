@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Content-hash short-circuit for scraper parse steps.
+
+Most polls fetch byte-identical rate tables even when the bank sends no
+cache headers. Each parse step's input is hashed, and when the digest
+matches the last successful parse the stored result is returned instead
+of building a BeautifulSoup tree or running PdfReader again.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from http_cache import refresh_timestamp
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), 'content_cache.json')
+
+def digest(content):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+class ContentCache:
+    """Last successful parse per (scraper, parse method), keyed by the input's SHA-256"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self.entries = json.load(file)
+        except Exception as e:
+            logging.warning(f"Could not read content cache, starting fresh: {str(e)}")
+
+    def _key(self, scraper, method):
+        return f"{type(scraper).__name__}.{method}"
+
+    def _lookup(self, key, content_digest):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry['digest'] == content_digest:
+                self.hits += 1
+                return True, refresh_timestamp(entry['result'])
+            self.misses += 1
+            return False, None
+
+    def _store(self, key, content_digest, result):
+        if result is None:
+            return
+        with self._lock:
+            self.entries[key] = {'digest': content_digest, 'result': result}
+
+    def parse(self, scraper, method, content, parse_pool=None):
+        """``scraper.<method>(content)``, skipped when ``content`` is unchanged since the last success"""
+        key = self._key(scraper, method)
+        content_digest = digest(content)
+        hit, result = self._lookup(key, content_digest)
+        if hit:
+            logging.info(f"Content unchanged, reusing last {key} result")
+            return result
+
+        if parse_pool:
+            result = parse_pool.parse(scraper, method, content)
+        else:
+            result = getattr(scraper, method)(content)
+        self._store(key, content_digest, result)
+        return result
+
+    async def parse_async(self, scraper, method, content, parse_pool=None):
+        """Like parse, but awaits the parse pool without blocking the event loop"""
+        key = self._key(scraper, method)
+        content_digest = digest(content)
+        hit, result = self._lookup(key, content_digest)
+        if hit:
+            logging.info(f"Content unchanged, reusing last {key} result")
+            return result
+
+        if parse_pool:
+            result = await parse_pool.parse_async(scraper, method, content)
+        else:
+            result = getattr(scraper, method)(content)
+        self._store(key, content_digest, result)
+        return result
+
+    def save(self):
+        logging.info(f"Content cache: {self.hits} hits, {self.misses} misses")
+        try:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving content cache: {str(e)}")
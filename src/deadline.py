@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), 'latency_history.json')
+
+class LatencyHistory:
+    """Rolling per-bank scrape latencies, persisted between runs"""
+
+    def __init__(self, path=HISTORY_PATH, max_samples=30):
+        self.path = path
+        self.max_samples = max_samples
+        self.samples = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self.samples = json.load(file)
+        except Exception as e:
+            logging.warning(f"Could not read latency history, starting fresh: {str(e)}")
+            self.samples = {}
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump(self.samples, file, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving latency history: {str(e)}")
+
+    def record(self, bank, seconds):
+        with self._lock:
+            history = self.samples.setdefault(bank, [])
+            history.append(round(seconds, 3))
+            del history[:-self.max_samples]
+
+    def percentile(self, bank, pct):
+        """Nearest-rank percentile of recorded latencies, or None without history"""
+        history = sorted(self.samples.get(bank, []))
+        if not history:
+            return None
+        rank = max(1, math.ceil(pct / 100 * len(history)))
+        return history[rank - 1]
+
+class RunDeadline:
+    """Total time budget for a run, split into per-bank timeouts.
+
+    Each bank gets ``headroom`` times its historical p95 latency (or its
+    registry cost hint, or ``default_timeout`` without either), clamped between ``min_timeout``
+    and whatever is left of the run budget. With ``budget=None`` the run is
+    unbounded and ``timeout_for`` returns None so scrapers keep their
+    built-in defaults.
+    """
+
+    def __init__(self, budget=None, history=None, headroom=1.5,
+                 default_timeout=30, min_timeout=5):
+        self.budget = budget
+        self.history = history or LatencyHistory()
+        self.headroom = headroom
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.started = time.monotonic()
+
+    def remaining(self):
+        if self.budget is None:
+            return None
+        return max(0.0, self.budget - (time.monotonic() - self.started))
+
+    def expired(self):
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout_for(self, bank, expected=None):
+        """Timeout for one attempt at ``bank``; ``expected`` is the registry's
+        cost hint, used in place of ``default_timeout`` until history exists"""
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+
+        p95 = self.history.percentile(bank, 95)
+        if p95 is not None:
+            wanted = p95 * self.headroom
+        elif expected:
+            wanted = expected * self.headroom
+        else:
+            wanted = self.default_timeout
+        return max(0.0, min(remaining, max(self.min_timeout, wanted)))
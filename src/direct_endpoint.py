@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Plain-HTTP replay of the request that carries a browser bank's rates.
+
+Endpoints are found by ``discover_endpoints.py`` and stored in
+endpoints.json. The runner tries them first and only falls back to Chrome
+when the direct request fails or no longer yields a rate.
+"""
+import json
+import logging
+import os
+import re
+from datetime import datetime
+
+ENDPOINTS_PATH = os.path.join(os.path.dirname(__file__), 'endpoints.json')
+
+# Headers Chrome sends that must not be replayed verbatim
+SKIPPED_HEADERS = ('cookie', 'content-length', 'accept-encoding', 'host', 'connection')
+
+def parse_number(value):
+    """Float from a JSON number or a string like '83.12' / '1,234.50'; None otherwise"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip().replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+def _mentions(value, currency):
+    return currency in json.dumps(value).upper()
+
+def resolve_path(data, path):
+    """Follow ``path`` into decoded JSON.
+
+    Path steps are dict keys, list indices, or ``{"match": "USD"}`` to pick
+    the first list item mentioning that currency, which keeps working when
+    the bank reorders its rows.
+    """
+    for step in path:
+        if isinstance(step, dict):
+            data = next(item for item in data if _mentions(item, step['match']))
+        else:
+            data = data[step]
+    return data
+
+def find_rate_path(data, rate, currency='USD'):
+    """Path to a value equal to ``rate`` inside a part of ``data`` mentioning ``currency``"""
+    def search(value, path):
+        number = parse_number(value)
+        if number is not None and abs(number - rate) < 1e-6:
+            return path
+        if isinstance(value, dict):
+            children = value.items()
+        elif isinstance(value, list):
+            children = enumerate(value)
+        else:
+            return None
+
+        for key, child in children:
+            # Only descend into list rows that belong to the currency
+            if isinstance(value, list) and isinstance(child, (dict, list)) and not _mentions(child, currency):
+                continue
+            found = search(child, path + [key])
+            if found is None:
+                continue
+            # Prefer matching list rows by currency over a fixed position
+            if isinstance(value, list):
+                generalized = path + [{'match': currency}] + found[len(path) + 1:]
+                try:
+                    if abs(parse_number(resolve_path(data, generalized)) - rate) < 1e-6:
+                        return generalized
+                except (StopIteration, KeyError, IndexError, TypeError):
+                    pass
+            return found
+        return None
+
+    return search(data, [])
+
+class DirectEndpoint:
+    """One HTTP request that returns a bank's rate table without a browser"""
+
+    def __init__(self, url, method='GET', headers=None, body=None, format='html', rate_path=None,
+                 bank_name=None):
+        self.url = url
+        self.method = method
+        self.headers = headers or {}
+        self.body = body
+        self.format = format  # 'html' is handed to the scraper's parse_rate, 'json' follows rate_path
+        self.rate_path = rate_path
+        self.bank_name = bank_name
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(**config)
+
+    def to_config(self):
+        return {
+            'url': self.url,
+            'method': self.method,
+            'headers': self.headers,
+            'body': self.body,
+            'format': self.format,
+            'rate_path': self.rate_path,
+            'bank_name': self.bank_name,
+        }
+
+    def fetch(self, timeout=30):
+        import requests
+
+        response = requests.request(
+            self.method, self.url, headers=self.headers, data=self.body, timeout=timeout
+        )
+        response.raise_for_status()
+        return response.text
+
+    def extract(self, text, scraper, parse_pool=None):
+        """Turn a response body into a rate record, or None"""
+        if self.format == 'json':
+            try:
+                data = json.loads(text)
+                tt_buy_rate = parse_number(resolve_path(data, self.rate_path))
+            except Exception as e:
+                logging.error(f"Could not follow rate path {self.rate_path}: {str(e)}")
+                return None
+            if tt_buy_rate is None:
+                return None
+            try:
+                currencies = currency_matrix(data, self.rate_path)
+            except Exception as e:
+                logging.warning(f"Could not read other currencies along {self.rate_path}: {str(e)}")
+                currencies = {}
+            currencies['USD'] = dict(currencies.get('USD', {}), tt_buy=tt_buy_rate)
+            return {
+                'bank': self.bank_name,
+                'tt_buy_rate': tt_buy_rate,
+                'currencies': currencies,
+                'timestamp': datetime.now().isoformat()
+            }
+
+        if parse_pool:
+            return parse_pool.parse(scraper, 'parse_rate', text)
+        return scraper.parse_rate(text)
+
+    def get_rate(self, scraper, timeout=30, parse_pool=None):
+        return self.extract(self.fetch(timeout), scraper, parse_pool)
+def _key_rate_type(key, rate_headers):
+    """Rate type a JSON key like "ttSell" or "TT_SELL_RATE" names, or None"""
+    normalised = re.sub(r'[^A-Z]', '', str(key).upper())
+    return next((rate_type for rate_type, aliases in rate_headers.items()
+                 if any(alias in normalised for alias in aliases)), None)
+
+def _row_currency(row, currencies, currency_code):
+    """The first known currency code among a JSON row's strings, or None"""
+    values = row.values() if isinstance(row, dict) else row if isinstance(row, list) else [row]
+    for value in values:
+        if isinstance(value, str):
+            code = next((code for code in currency_code.findall(value.upper()) if code in currencies), None)
+            if code:
+                return code
+    return None
+
+def currency_matrix(data, path):
+    """``{currency: {rate_type: float}}`` for every row beside the one ``path`` reads.
+
+    The step that picks the headline currency, ``{"match": "USD"}`` in a
+    list or a ``"USD"`` key in a dict, is applied to each currency in turn
+    and the rest of the path gives that row's TT buy rate. Other rate types
+    come from sibling keys named like the table headers, e.g. ``ttSell``.
+    """
+    from table_spec import CURRENCIES, CURRENCY_CODE, RATE_HEADERS
+
+    split = next((index for index, step in enumerate(path)
+                  if isinstance(step, dict) or step in CURRENCIES), None)
+    if split is None:
+        return {}
+    container = resolve_path(data, path[:split])
+    if isinstance(path[split], dict):
+        rows = [(_row_currency(row, CURRENCIES, CURRENCY_CODE), row) for row in container]
+    else:
+        rows = [(key, row) for key, row in container.items() if key in CURRENCIES]
+
+    rest = path[split + 1:]
+    matrix = {}
+    for currency, row in rows:
+        if currency is None or currency in matrix:
+            continue
+        try:
+            tt_buy = parse_number(resolve_path(row, rest))
+            fields = resolve_path(row, rest[:-1])
+        except (StopIteration, KeyError, IndexError, TypeError):
+            continue
+        if tt_buy is None:
+            continue
+        rates = {'tt_buy': tt_buy}
+        if isinstance(fields, dict):
+            for key, value in fields.items():
+                rate_type = _key_rate_type(key, RATE_HEADERS)
+                number = parse_number(value)
+                if rate_type and rate_type not in rates and number is not None:
+                    rates[rate_type] = number
+        matrix[currency] = rates
+    return matrix
+
+def load_endpoints(path=ENDPOINTS_PATH):
+    """``{bank: endpoint config}`` from endpoints.json, empty when none were discovered"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def save_endpoint(bank, endpoint, path=ENDPOINTS_PATH):
+    endpoints = load_endpoints(path)
+    endpoints[bank] = endpoint.to_config()
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(endpoints, file, indent=2)
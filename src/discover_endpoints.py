@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Find the plain-HTTP request behind a browser bank's rate table.
+
+Loads the bank page once in Chrome with performance logging, lets the
+scraper extract the rate as usual, then looks through every document, XHR
+and fetch response for one that carries the same rate. Each candidate is
+replayed without a browser, and the first one that still yields the rate
+is printed as an endpoint spec (and saved to endpoints.json with --write).
+
+    cd src && python discover_endpoints.py kotak [--write]
+"""
+import argparse
+import base64
+import json
+import logging
+
+from registry import ScraperRegistry
+from direct_endpoint import DirectEndpoint, SKIPPED_HEADERS, find_rate_path, save_endpoint
+
+# JSON APIs are the cheapest to replay, so they are tried before HTML
+CANDIDATE_TYPES = ('XHR', 'Fetch', 'Document')
+
+def capture_responses(driver):
+    """Requests seen in the performance log, with their response bodies"""
+    requests_by_id = {}
+    responses = []
+    for entry in driver.get_log('performance'):
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+
+        params = message.get('params', {})
+        if message.get('method') == 'Network.requestWillBeSent':
+            requests_by_id[params['requestId']] = params['request']
+        elif message.get('method') == 'Network.responseReceived':
+            if params.get('type') in CANDIDATE_TYPES and params['response'].get('status') == 200:
+                responses.append((params['requestId'], params['type'], params['response']))
+
+    captured = []
+    for request_id, resource_type, response in responses:
+        request = requests_by_id.get(request_id)
+        if not request:
+            continue
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception:
+            # Bodies of redirected or evicted responses are no longer available
+            continue
+        body = result['body']
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        captured.append({
+            'type': resource_type,
+            'request': request,
+            'mime_type': response.get('mimeType', ''),
+            'body': body,
+        })
+
+    captured.sort(key=lambda item: CANDIDATE_TYPES.index(item['type']))
+    return captured
+
+def build_candidate(response, rate):
+    """Endpoint spec for a captured response that contains the rate, or None"""
+    request = response['request']
+    headers = {
+        name: value for name, value in request.get('headers', {}).items()
+        if not name.startswith(':') and name.lower() not in SKIPPED_HEADERS
+    }
+    endpoint = DirectEndpoint(
+        url=request['url'],
+        method=request.get('method', 'GET'),
+        headers=headers,
+        body=request.get('postData'),
+        bank_name=rate['bank'],
+    )
+
+    if 'json' in response['mime_type'] or response['body'].lstrip().startswith(('{', '[')):
+        try:
+            data = json.loads(response['body'])
+        except ValueError:
+            return None
+        path = find_rate_path(data, rate['tt_buy_rate'])
+        if path is None:
+            return None
+        endpoint.format = 'json'
+        endpoint.rate_path = path
+        return endpoint
+
+    if 'USD' in response['body']:
+        endpoint.format = 'html'
+        return endpoint
+    return None
+
+def verify(endpoint, scraper, rate):
+    """Replay the request without a browser and check it yields the same rate"""
+    try:
+        replayed = endpoint.get_rate(scraper)
+    except Exception as e:
+        logging.info(f"Replay of {endpoint.url} failed: {str(e)}")
+        return False
+    return bool(replayed) and abs(replayed['tt_buy_rate'] - rate['tt_buy_rate']) < 1e-6
+
+def discover(spec):
+    """Return a verified DirectEndpoint for a browser bank, or None"""
+    from driver_pool import create_chrome_driver
+
+    scraper = spec.load()()
+    driver = create_chrome_driver()
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        scraper.driver = driver
+        rate = scraper.get_rate()
+        if not rate:
+            logging.error(f"{spec.name}: the browser scraper found no rate, nothing to look for")
+            return None
+        logging.info(f"{spec.name}: browser rate is {rate['tt_buy_rate']}")
+
+        for response in capture_responses(driver):
+            endpoint = build_candidate(response, rate)
+            if endpoint is None:
+                continue
+            logging.info(f"{spec.name}: candidate {response['type']} {endpoint.method} {endpoint.url}")
+            if verify(endpoint, scraper, rate):
+                return endpoint
+        return None
+    finally:
+        driver.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('bank', help="Browser bank to inspect, e.g. kotak")
+    parser.add_argument('--write', action='store_true', help="Save the endpoint to endpoints.json")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    registry = ScraperRegistry()
+    try:
+        spec = registry.get(args.bank)
+    except KeyError as e:
+        parser.error(str(e))
+    if not spec.needs_browser:
+        parser.error(f"{args.bank} is already scraped without a browser")
+
+    endpoint = discover(spec)
+    if endpoint is None:
+        print(f"No replayable endpoint found for {args.bank}")
+        return
+
+    print(json.dumps({args.bank: endpoint.to_config()}, indent=2))
+    if args.write:
+        save_endpoint(args.bank, endpoint)
+        print("Saved to endpoints.json")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+def create_chrome_driver(page_load_timeout=90):
+    """Launch a headless Chrome instance with the options shared by all scrapers"""
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    # Network events feed the resource-policy metrics
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_page_load_timeout(page_load_timeout)
+    return driver
+
+class DriverPool:
+    """Pool of warm Chrome instances leased to Selenium scrapers.
+
+    Drivers are launched up front, handed out through ``lease()`` and wiped
+    (cookies, every visited origin's storage, extra tabs) before being
+    returned to the pool. A driver that fails its health check is quit and
+    replaced with a fresh one. When every driver stays leased past the
+    lease timeout, an extra one is launched for that lease and quit when
+    it is returned, so the pool never holds more than ``size`` drivers.
+    """
+
+    def __init__(self, size=3, page_load_timeout=90):
+        self.size = size
+        self.page_load_timeout = page_load_timeout
+        self._idle = queue.Queue()
+        self._all = []
+        self._overflow = set()  # Extra drivers launched past size, quit on release
+        self._launching = 0  # Pool slots claimed by launches still in progress
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def start(self, count=None):
+        """Pre-launch ``count`` drivers (default: all) in parallel; the rest launch on first lease"""
+        count = self.size if count is None else count
+        with ThreadPoolExecutor(max_workers=max(1, count)) as executor:
+            futures = [executor.submit(self._launch) for _ in range(count) if self._reserve()]
+            for future in futures:
+                try:
+                    self._idle.put(future.result())
+                except Exception as e:
+                    logging.error(f"Error launching pooled Chrome: {str(e)}")
+
+        logging.info(f"Driver pool started with {self._idle.qsize()}/{self.size} drivers")
+        return self
+
+    def _reserve(self):
+        """Claim a pool slot for a new driver; False when the pool is already full"""
+        with self._lock:
+            if len(self._all) - len(self._overflow) + self._launching >= self.size:
+                return False
+            self._launching += 1
+            return True
+
+    def _launch(self, overflow=False):
+        """Start a driver in a slot claimed with _reserve(), or an extra one past size"""
+        try:
+            driver = create_chrome_driver(self.page_load_timeout)
+        except Exception:
+            if not overflow:
+                with self._lock:
+                    self._launching -= 1
+            raise
+        with self._lock:
+            self._all.append(driver)
+            if overflow:
+                self._overflow.add(driver)
+            else:
+                self._launching -= 1
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+            self._overflow.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _is_healthy(self, driver):
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def _visited_origins(self, driver):
+        """http(s) origins in the current tab's navigation history, redirects included"""
+        history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+        origins = set()
+        for entry in history.get('entries', []):
+            parts = urlsplit(entry.get('url', ''))
+            if parts.scheme in ('http', 'https') and parts.netloc:
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+        return origins
+
+    def _reset(self, driver):
+        """Clear per-lease state so the next scraper starts from a blank browser"""
+        handles = driver.window_handles
+        origins = set()
+        for handle in reversed(handles):
+            driver.switch_to.window(handle)
+            origins |= self._visited_origins(driver)
+            if handle != handles[0]:
+                driver.close()
+        driver.switch_to.window(handles[0])
+
+        # delete_all_cookies() and a storage clear from script only reach the current origin;
+        # CDP wipes every cookie and each visited origin's storage wherever the tab ended up
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        for origin in origins:
+            driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+        driver.set_page_load_timeout(self.page_load_timeout)
+        driver.get('about:blank')
+        driver.execute_cdp_cmd('Page.resetNavigationHistory', {})
+
+    def _acquire(self, timeout):
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            if self._reserve():
+                return self._launch()
+            try:
+                driver = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                logging.warning("Driver pool exhausted, launching an extra Chrome instance for this lease")
+                return self._launch(overflow=True)
+
+        if self._is_healthy(driver):
+            return driver
+
+        logging.warning("Pooled Chrome failed health check, replacing it")
+        self._discard(driver)
+        return self._launch(overflow=not self._reserve())
+
+    def _release(self, driver):
+        with self._lock:
+            overflow = driver in self._overflow
+        if self._closed or overflow:
+            self._discard(driver)
+            return
+
+        try:
+            self._reset(driver)
+        except Exception as e:
+            logging.warning(f"Could not reset pooled Chrome, replacing it: {str(e)}")
+            self._discard(driver)
+            if not self._reserve():
+                return
+            try:
+                driver = self._launch()
+            except Exception as e:
+                logging.error(f"Error relaunching pooled Chrome: {str(e)}")
+                return
+
+        self._idle.put(driver)
+
+    @contextmanager
+    def lease(self, timeout=120):
+        """Borrow a driver for the duration of a ``with`` block"""
+        driver = self._acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self._release(driver)
+
+    def shutdown(self):
+        """Quit every driver owned by the pool"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all)
+            self._all.clear()
+            self._overflow.clear()
+
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logging.error(f"Error closing pooled Chrome: {str(e)}")
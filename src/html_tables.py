@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Fast extraction of table rows from bank pages.
+
+Scrapers only ever need the cell texts of a few tables, so instead of a
+full BeautifulSoup tree over the whole page the tables matching a simple
+selector (``table``, ``table.cls``, ``table#id``, ``table.a.b``) are
+located with an lxml XPath query. Without lxml, BeautifulSoup is used with
+a SoupStrainer so that only the matching tables are ever built.
+"""
+import importlib.util
+import re
+from functools import lru_cache
+
+LXML_AVAILABLE = importlib.util.find_spec('lxml') is not None
+
+SELECTOR = re.compile(r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<rest>(?:[.#][\w-]+)*)$')
+
+@lru_cache(maxsize=None)
+def compile_selector(selector):
+    """Split a simple selector into (tag, classes, id)"""
+    match = SELECTOR.match(selector.strip())
+    if not match:
+        raise ValueError(f"Unsupported table selector: '{selector}'")
+    parts = re.findall(r'([.#])([\w-]+)', match.group('rest'))
+    classes = tuple(name for kind, name in parts if kind == '.')
+    ids = [name for kind, name in parts if kind == '#']
+    return (match.group('tag') or 'table').lower(), classes, ids[0] if ids else None
+
+@lru_cache(maxsize=None)
+def selector_xpath(selector):
+    tag, classes, element_id = compile_selector(selector)
+    conditions = [f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes]
+    if element_id:
+        conditions.append(f"@id='{element_id}'")
+    return f"//{tag}" + ''.join(f"[{condition}]" for condition in conditions)
+
+def _rows_lxml(html, selector, cell_tags, limit, indices):
+    from lxml import html as lxml_html
+
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration
+        html = html.encode('utf-8')
+    tree = lxml_html.fromstring(html)
+
+    if indices is not None:
+        # XPath positions are 1-based; only the requested tables are ever read
+        positions = ' or '.join(f"position()={index + 1}" for index in sorted(indices))
+        matches = tree.xpath(f"({selector_xpath(selector)})[{positions}]") if positions else []
+    else:
+        matches = tree.xpath(selector_xpath(selector))[:limit]
+
+    tables = []
+    for table in matches:
+        tables.append([
+            [cell.text_content().strip() for cell in row if cell.tag in cell_tags]
+            for row in table.iter('tr')
+        ])
+    return tables
+
+def _rows_soup(html, selector, cell_tags, limit, indices):
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    tag, classes, element_id = compile_selector(selector)
+    strainer = SoupStrainer(tag, id=element_id) if element_id else SoupStrainer(tag)
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
+
+    tables = []
+    position = -1
+    for table in soup.find_all(tag):
+        if not set(classes) <= set(table.get('class', [])):
+            continue
+        position += 1
+        if indices is not None and position not in indices:
+            continue
+        tables.append([
+            [cell.get_text().strip() for cell in row.find_all(list(cell_tags), recursive=False)]
+            for row in table.find_all('tr')
+        ])
+        if (limit and len(tables) >= limit) or (indices is not None and len(tables) >= len(indices)):
+            break
+    return tables
+
+def table_rows(html, selector='table', cell_tags=('td', 'th'), limit=None, indices=None):
+    """Cell texts of every table matching ``selector``: a list of tables, each a list of rows.
+
+    ``limit`` stops after that many tables, e.g. 1 for "the first table".
+    ``indices`` reads only the tables at those positions among the matches,
+    in document order; missing positions are simply absent.
+    """
+    if indices is not None:
+        indices = frozenset(indices)
+    if LXML_AVAILABLE:
+        return _rows_lxml(html, selector, frozenset(cell_tags), limit, indices)
+    return _rows_soup(html, selector, cell_tags, limit, indices)
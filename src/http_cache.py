@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Conditional-GET cache for bank pages and PDFs.
+
+Instead of response bodies, the cache keeps each URL's validators (ETag,
+Last-Modified) next to the result its parser produced. Unchanged content
+then costs neither the download nor the parse: a 304 from the bank, or a
+response still fresh under ``Cache-Control: max-age``, hands back the
+stored result directly.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), 'http_cache.json')
+
+def refresh_timestamp(result):
+    """Copy of a cached parse result with a fresh timestamp if it is a rate record.
+
+    Unchanged content still means the rate was observed just now.
+    """
+    if isinstance(result, dict) and 'timestamp' in result:
+        return dict(result, timestamp=datetime.now().isoformat())
+    return result
+
+class ResponseTooLarge(Exception):
+    """A download exceeded its size cap"""
+
+def read_capped(chunks, max_bytes, declared_length=None):
+    """Join streamed ``chunks``, giving up as soon as they exceed ``max_bytes``"""
+    if declared_length and str(declared_length).isdigit() and int(declared_length) > max_bytes:
+        raise ResponseTooLarge(f"Response declares {declared_length} bytes, cap is {max_bytes}")
+
+    body = bytearray()
+    for chunk in chunks:
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise ResponseTooLarge(f"Response exceeded {max_bytes} bytes")
+    return bytes(body)
+
+def parse_cache_control(value):
+    """``{'max-age': '300', 'no-cache': True, ...}`` from a Cache-Control header"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else True
+    return directives
+
+class HttpCache:
+    """Validators and parsed results per (URL, parser), persisted between runs"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as file:
+                    self.entries = json.load(file)
+        except Exception as e:
+            logging.warning(f"Could not read HTTP cache, starting fresh: {str(e)}")
+
+    def _key(self, url, parser):
+        return f"{parser} {url}"
+
+    def _lookup(self, url, parser):
+        """Return (cached entry or None, extra request headers, still fresh)"""
+        entry = self.entries.get(self._key(url, parser))
+        if not entry:
+            return None, {}, False
+
+        if entry.get('expires') and time.time() < entry['expires']:
+            return entry, {}, True
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return entry, headers, False
+
+    def _store(self, url, parser, response_headers, result):
+        directives = parse_cache_control(response_headers.get('Cache-Control'))
+        key = self._key(url, parser)
+        with self._lock:
+            if 'no-store' in directives or result is None:
+                self.entries.pop(key, None)
+                return
+
+            expires = None
+            max_age = directives.get('max-age')
+            if 'no-cache' not in directives and isinstance(max_age, str) and re.fullmatch(r'\d+', max_age):
+                expires = time.time() + int(max_age)
+
+            self.entries[key] = {
+                'etag': response_headers.get('ETag'),
+                'last_modified': response_headers.get('Last-Modified'),
+                'expires': expires,
+                'result': result,
+            }
+
+    def _refresh(self, url, parser, entry, response_headers):
+        """A 304 may carry updated validators and a new max-age"""
+        self._store(url, parser, {
+            'ETag': response_headers.get('ETag') or entry.get('etag'),
+            'Last-Modified': response_headers.get('Last-Modified') or entry.get('last_modified'),
+            'Cache-Control': response_headers.get('Cache-Control'),
+        }, entry['result'])
+
+    def _hit(self, url, parser, entry, reason):
+        with self._lock:
+            self.hits += 1
+        logging.info(f"HTTP cache hit ({reason}) for {url}")
+        return refresh_timestamp(entry['result'])
+
+    def _miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def fetch(self, url, parse, parser, headers=None, timeout=30, content=False, max_bytes=None):
+        """GET ``url`` with requests and return ``parse(body)``, reusing the cached result when unchanged.
+
+        ``parser`` names the parse step, so one URL can be cached for more
+        than one kind of result. ``content`` passes bytes instead of text;
+        ``max_bytes`` streams the body (as bytes) and aborts past that size.
+        Transport and HTTP errors propagate.
+        """
+        import requests
+
+        entry, conditional, fresh = self._lookup(url, parser)
+        if fresh:
+            return self._hit(url, parser, entry, 'fresh')
+
+        response = requests.get(url, headers={**(headers or {}), **conditional}, timeout=timeout,
+                                stream=bool(max_bytes))
+        if response.status_code == 304 and entry:
+            self._refresh(url, parser, entry, response.headers)
+            return self._hit(url, parser, entry, 'not modified')
+        response.raise_for_status()
+
+        self._miss()
+        if max_bytes:
+            body = read_capped(response.iter_content(64 * 1024), max_bytes, response.headers.get('Content-Length'))
+        else:
+            body = response.content if content else response.text
+        result = parse(body)
+        self._store(url, parser, response.headers, result)
+        return result
+
+    async def fetch_async(self, engine, url, parse, parser, headers=None, timeout=30, content=False,
+                          max_bytes=None):
+        """Like fetch, but through the shared HttpEngine; ``parse`` returns an awaitable"""
+        entry, conditional, fresh = self._lookup(url, parser)
+        if fresh:
+            return self._hit(url, parser, entry, 'fresh')
+
+        request_headers = {**(headers or {}), **conditional}
+        if max_bytes:
+            response, body = await engine.download(url, max_bytes, headers=request_headers, timeout=timeout)
+        else:
+            response = await engine.get(url, headers=request_headers, timeout=timeout)
+            body = response.content if content else response.text
+        if response.status_code == 304 and entry:
+            self._refresh(url, parser, entry, response.headers)
+            return self._hit(url, parser, entry, 'not modified')
+        response.raise_for_status()
+
+        self._miss()
+        result = await parse(body)
+        self._store(url, parser, response.headers, result)
+        return result
+
+    def save(self):
+        logging.info(f"HTTP cache: {self.hits} hits, {self.misses} misses")
+        try:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving HTTP cache: {str(e)}")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import asyncio
+import importlib.util
+import logging
+from urllib.parse import urlsplit
+import httpx
+
+# httpx negotiates HTTP/2 only when h2 is installed; check without importing it
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+class HttpEngine:
+    """Shared async HTTP client for request-based scrapers.
+
+    All scrapers run on one event loop and share a single keep-alive
+    connection pool (HTTP/2 when ``h2`` is installed). Requests to the same
+    host are capped by ``per_host_limit`` so we never hammer one bank.
+    """
+
+    def __init__(self, per_host_limit=4, max_connections=20, timeout=30):
+        self.per_host_limit = per_host_limit
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.client = None
+        self._host_slots = {}
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            follow_redirects=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+        self.client = None
+
+    def _slot(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_slots[host]
+
+    async def request(self, method, url, **kwargs):
+        async with self._slot(url):
+            logging.info(f"{method} {url}")
+            return await self.client.request(method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def download(self, url, max_bytes, method='GET', **kwargs):
+        """Stream a response body, aborting with ResponseTooLarge past ``max_bytes``.
+
+        Returns ``(response, body)``; the response is closed but its status
+        and headers remain available.
+        """
+        from http_cache import ResponseTooLarge
+
+        async with self._slot(url):
+            logging.info(f"{method} {url} (streamed, max {max_bytes} bytes)")
+            async with self.client.stream(method, url, **kwargs) as response:
+                declared = response.headers.get('Content-Length')
+                if declared and declared.isdigit() and int(declared) > max_bytes:
+                    raise ResponseTooLarge(f"Response declares {declared} bytes, cap is {max_bytes}")
+
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) > max_bytes:
+                        raise ResponseTooLarge(f"Response exceeded {max_bytes} bytes")
+                return response, bytes(body)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+def _run_parser(module_name, class_name, spec, method, content):
+    """Worker-side entry point: rebuild the scraper from its spec and run one parse method"""
+    scraper_class = getattr(importlib.import_module(module_name), class_name)
+    return getattr(scraper_class(spec), method)(content)
+
+class ParsePool:
+    """Runs scraper parse methods in worker processes.
+
+    Fetching stays in the runner's threads and event loop; only the raw page
+    or PDF is shipped to a worker, and only the compact parse result comes
+    back. BeautifulSoup and PyPDF2 are pure Python, so this is what lets
+    parsing use more than one core.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers
+        self.executor = None
+
+    def start(self):
+        # By now the scheduler and driver threads are running, and forking a threaded
+        # process can deadlock a child on a lock some thread held; start workers clean
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        logging.info(f"Parse pool started with {self.workers or os.cpu_count()} workers")
+        return self
+
+    def _submit(self, scraper, method, content):
+        scraper_class = type(scraper)
+        return self.executor.submit(
+            _run_parser, scraper_class.__module__, scraper_class.__name__, scraper.spec, method, content
+        )
+
+    def parse(self, scraper, method, content):
+        """Run ``scraper.<method>(content)`` in a worker and wait for the result"""
+        return self._submit(scraper, method, content).result()
+
+    async def parse_async(self, scraper, method, content):
+        """Like parse, but awaits the worker without blocking the event loop"""
+        import asyncio
+
+        return await asyncio.wrap_future(self._submit(scraper, method, content))
+
+    def shutdown(self):
+        if self.executor:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Interchangeable PDF text-extraction backends.
+
+Every backend opens the PDF bytes once and returns the text of a single
+page on demand, one table row per line, optionally limited to a bounding
+box ``(left, bottom, right, top)`` in PDF points:
+
+- ``pypdf2``: the original pure-Python extractor; ignores the bounding box
+- ``pypdfium2``: PDFium's C++ text engine, by far the fastest
+- ``pdfminer``: layout analysis that rebuilds rows from text positions,
+  for sheets where the other two emit cells out of order
+"""
+import importlib.util
+import io
+import logging
+
+DEFAULT_BACKEND = 'pypdf2'
+
+class PyPDF2Backend:
+    name = 'pypdf2'
+    module = 'PyPDF2'
+
+    def __init__(self, pdf_content):
+        from PyPDF2 import PdfReader
+
+        self.reader = PdfReader(io.BytesIO(pdf_content))
+
+    @property
+    def page_count(self):
+        return len(self.reader.pages)
+
+    def page_text(self, index, bbox=None):
+        return self.reader.pages[index].extract_text() or ''
+
+class PdfiumBackend:
+    name = 'pypdfium2'
+    module = 'pypdfium2'
+
+    def __init__(self, pdf_content):
+        import pypdfium2
+
+        self.document = pypdfium2.PdfDocument(pdf_content)
+
+    @property
+    def page_count(self):
+        return len(self.document)
+
+    def page_text(self, index, bbox=None):
+        textpage = self.document[index].get_textpage()
+        if bbox:
+            left, bottom, right, top = bbox
+            text = textpage.get_text_bounded(left=left, bottom=bottom, right=right, top=top)
+        else:
+            text = textpage.get_text_range()
+        return text.replace('\r\n', '\n')
+
+class PdfminerBackend:
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    # Text lines whose vertical centres are this close (in points) share a row
+    ROW_TOLERANCE = 3
+
+    def __init__(self, pdf_content):
+        from pdfminer.pdfparser import PDFParser
+        from pdfminer.pdfdocument import PDFDocument
+        from pdfminer.pdfpage import PDFPage
+
+        document = PDFDocument(PDFParser(io.BytesIO(pdf_content)))
+        self.pages = list(PDFPage.create_pages(document))
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def _text_lines(self, index):
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams, LTTextContainer, LTTextLine
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+
+        resources = PDFResourceManager()
+        device = PDFPageAggregator(resources, laparams=LAParams())
+        PDFPageInterpreter(resources, device).process_page(self.pages[index])
+
+        for element in device.get_result():
+            if not isinstance(element, LTTextContainer):
+                continue
+            for line in element:
+                if isinstance(line, LTTextLine) and line.get_text().strip():
+                    yield line
+
+    def page_text(self, index, bbox=None):
+        lines = []
+        for line in self._text_lines(index):
+            if bbox:
+                left, bottom, right, top = bbox
+                if line.x1 < left or line.x0 > right or line.y1 < bottom or line.y0 > top:
+                    continue
+            lines.append(((line.y0 + line.y1) / 2, line.x0, line.get_text().strip()))
+
+        # Rebuild table rows top to bottom, cells left to right
+        rows = []
+        for centre, x0, text in sorted(lines, key=lambda item: -item[0]):
+            if rows and abs(rows[-1][0] - centre) <= self.ROW_TOLERANCE:
+                rows[-1][1].append((x0, text))
+            else:
+                rows.append((centre, [(x0, text)]))
+        return '\n'.join(' '.join(text for _, text in sorted(cells)) for _, cells in rows)
+
+BACKENDS = {backend.name: backend for backend in (PyPDF2Backend, PdfiumBackend, PdfminerBackend)}
+
+def available_backends():
+    """Names of the backends whose library is installed"""
+    return [name for name, backend in BACKENDS.items() if importlib.util.find_spec(backend.module)]
+
+def open_pdf(pdf_content, backend=DEFAULT_BACKEND):
+    """Open PDF bytes with the named backend, falling back to the default if it is not installed"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{backend}'. Known backends: {', '.join(BACKENDS)}")
+    if backend != DEFAULT_BACKEND and not importlib.util.find_spec(BACKENDS[backend].module):
+        logging.warning(f"PDF backend '{backend}' is not installed, using {DEFAULT_BACKEND}")
+        backend = DEFAULT_BACKEND
+    return BACKENDS[backend](pdf_content)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Single-writer persistence for a scraper run.
+
+Scrapers never touch the data files. The runner submits each rate record
+to a PersistenceQueue as soon as a bank finishes (from scheduler threads
+or the HTTP event loop); one writer thread drains the queue and, when
+the run ends, stores the whole batch in a single commit through
+rate_store.save_rates, which serialises commits across processes.
+"""
+import logging
+import queue
+import threading
+
+from rate_store import DEFAULT_STORE
+
+_STOP = object()
+
+class PersistenceQueue:
+    """Collects a run's rate records and commits them once, from one thread"""
+
+    def __init__(self, store=DEFAULT_STORE, prepare=None):
+        self.store = store
+        self.prepare = prepare  # Called with the batch just before the commit, e.g. SelectorCache.learn
+        self.records = []
+        self.committed = False
+        self._queue = queue.Queue()
+        self._writer = None
+
+    def start(self):
+        self._writer = threading.Thread(target=self._run, name='rate-writer', daemon=True)
+        self._writer.start()
+        return self
+
+    def submit(self, record):
+        """Queue a rate record; safe from any thread or the event loop"""
+        if record:
+            self._queue.put(record)
+
+    def _run(self):
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                break
+            self.records.append(record)
+
+        if not self.records:
+            return
+        from rate_store import save_rates
+
+        try:
+            if self.prepare:
+                self.prepare(self.records)
+        except Exception as e:
+            logging.error(f"Error preparing rates for storage: {str(e)}")
+        self.committed = save_rates(self.records, self.store)
+
+    def close(self):
+        """Stop accepting records, wait for the commit and return the run's records"""
+        if self._writer:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        return self.records
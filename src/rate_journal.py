@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Append-only rate journal with compaction into the dashboard snapshot.
+
+Every rate record is appended as one JSON line to a monthly journal file
+(``rate_journal/2026-10.jsonl``), so a write never reads or rewrites
+earlier history and the journal keeps every record ever scraped.
+
+``compact()`` (``export_snapshot()`` in the rate_store interface) folds
+the journal's recent days into ``all_banks_data.json``, the snapshot
+``index.html`` reads. It only opens the monthly files that overlap the
+snapshot window, so its cost depends on the window, not on how much
+history the journal holds.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from rate_store import SNAPSHOT_DAYS, SNAPSHOT_PATH, RateStore, history_records, write_json_atomic
+
+JOURNAL_DIR = os.path.join(os.path.dirname(__file__), 'rate_journal')
+
+class RateJournal(RateStore):
+    """Monthly JSONL journal of rate records plus the JSON snapshot compacted from it"""
+
+    name = 'journal'
+
+    def __init__(self, journal_dir=JOURNAL_DIR, snapshot_path=SNAPSHOT_PATH, snapshot_days=SNAPSHOT_DAYS):
+        self.journal_dir = journal_dir
+        self.snapshot_path = snapshot_path
+        self.snapshot_days = snapshot_days
+
+    def _month_path(self, month):
+        return os.path.join(self.journal_dir, f"{month}.jsonl")
+
+    def append(self, records, date=None):
+        """Append records under ``date`` (default today) without touching existing history"""
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        os.makedirs(self.journal_dir, exist_ok=True)
+        lines = ''.join(json.dumps({'date': date, 'rate': record}) + '\n' for record in records)
+        with open(self._month_path(date[:7]), 'ab+') as file:
+            # Never glue a record onto a line torn by an interrupted append
+            if file.seek(0, os.SEEK_END):
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    lines = '\n' + lines
+            file.write(lines.encode('utf-8'))
+            file.flush()
+            os.fsync(file.fileno())
+        logging.info(f"Journaled {len(records)} rates for {date}")
+
+    def save(self, records, date=None):
+        self.append(records, date)
+
+    def entries(self, since):
+        """``(date, record)`` pairs from the journal on or after ``since`` (YYYY-MM-DD), oldest first"""
+        if not os.path.isdir(self.journal_dir):
+            return
+        months = sorted(name[:-len('.jsonl')] for name in os.listdir(self.journal_dir) if name.endswith('.jsonl'))
+        for month in months:
+            if month < since[:7]:
+                continue
+            with open(self._month_path(month), 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A run killed mid-append leaves at most one torn last line
+                        logging.warning(f"Skipping unreadable journal line in {month}.jsonl")
+                        continue
+                    if entry['date'] >= since:
+                        yield entry['date'], entry['rate']
+
+    def _load_snapshot(self):
+        try:
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                if isinstance(data, dict) and isinstance(data.get("historical_data"), list):
+                    return data
+        except Exception as e:
+            logging.warning(f"Could not read {self.snapshot_path}, rebuilding it from the journal: {str(e)}")
+        return {"historical_data": []}
+
+    def compact(self):
+        """Rewrite the snapshot: its last ``snapshot_days`` days with the journal applied on top"""
+        since = (datetime.now() - timedelta(days=self.snapshot_days - 1)).strftime('%Y-%m-%d')
+        data = self._load_snapshot()
+        days = {entry["date"]: entry for entry in data["historical_data"]}
+
+        # Replaying in order keeps the old "update or add" semantics: the last record per bank and day wins
+        for date, record in self.entries(since):
+            day = days.setdefault(date, {"date": date, "rates": []})
+            for index, existing in enumerate(day["rates"]):
+                if existing.get("bank") == record["bank"]:
+                    day["rates"][index] = record
+                    break
+            else:
+                day["rates"].append(record)
+
+        data["historical_data"] = sorted(days.values(), key=lambda entry: entry["date"], reverse=True)
+        data["historical_data"] = data["historical_data"][:self.snapshot_days]
+
+        write_json_atomic(self.snapshot_path, data)
+        logging.info(f"Compacted journal into {os.path.basename(self.snapshot_path)} "
+                     f"({len(data['historical_data'])} days)")
+
+    def export_snapshot(self):
+        self.compact()
+
+    def records(self):
+        # Records older than the journal only survive in the snapshot
+        return history_records(self.snapshot_path)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Pluggable storage for scraped rate records.
+
+Every backend keeps the full history in its own format and can export the
+``all_banks_data.json`` snapshot that ``index.html`` reads:
+
+- ``journal``: append-only monthly JSONL files (rate_journal.py)
+- ``sqlite``: one row per (date, bank, currency, rate type) in rates.db,
+  indexed for range queries (sqlite_store.py)
+- ``columnar``: memory-mapped column files partitioned by month, for
+  scanning long history without parsing JSON (columnar_store.py)
+"""
+import importlib
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), 'all_banks_data.json')
+LOCK_PATH = SNAPSHOT_PATH + '.lock'
+
+# Days of history in the dashboard snapshot; the stores themselves are never trimmed
+SNAPSHOT_DAYS = 15
+
+DEFAULT_STORE = 'journal'
+
+# Imported on first use, like the scrapers in registry.py
+STORES = {
+    'journal': ('rate_journal', 'RateJournal'),
+    'sqlite': ('sqlite_store', 'SQLiteRateStore'),
+    'columnar': ('columnar_store', 'ColumnarRateStore'),
+}
+
+class RateStore:
+    """Interface for rate storage backends"""
+
+    name = None
+
+    def save(self, records, date=None):
+        """Store a run's records under ``date`` (default today); a later record for the same bank and day updates it"""
+        raise NotImplementedError
+
+    def export_snapshot(self):
+        """Write the dashboard snapshot from the stored history"""
+        raise NotImplementedError
+
+    def empty(self):
+        """True when a store that rebuilds the snapshot from itself holds no history yet"""
+        return False
+
+    def import_history(self):
+        """Load the dashboard snapshot and the journal into the store"""
+        raise NotImplementedError
+
+    def records(self):
+        """Every stored ``(date, record)`` pair, oldest first"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+def record_rows(date, record):
+    """Flatten a rate record into ``(date, bank, currency, rate_type, rate, timestamp)`` rows"""
+    currencies = dict(record.get('currencies') or {})
+    # tt_buy_rate is the USD headline even for records without a matrix
+    currencies['USD'] = dict(currencies.get('USD', {}), tt_buy=record['tt_buy_rate'])
+    return [
+        (date, record['bank'], currency, rate_type, rate, record['timestamp'])
+        for currency, rates in currencies.items()
+        for rate_type, rate in rates.items()
+    ]
+
+def records_from_rows(rows):
+    """``(date, record)`` pairs rebuilt from flattened rows, oldest first.
+
+    Rows may come in any order within a day; later rows for the same rate win.
+    """
+    entries = {}
+    for date, bank, currency, rate_type, rate, timestamp in rows:
+        record = entries.setdefault((date, bank), {'bank': bank, 'currencies': {}, 'timestamp': timestamp})
+        record['currencies'].setdefault(currency, {})[rate_type] = rate
+        record['timestamp'] = max(record['timestamp'], timestamp)
+
+    records = []
+    for (date, bank), record in sorted(entries.items(), key=lambda item: (item[0][0], item[1]['timestamp'])):
+        usd = record['currencies'].get('USD', {})
+        if 'tt_buy' not in usd:
+            continue
+        records.append((date, {
+            'bank': bank,
+            'tt_buy_rate': usd['tt_buy'],
+            'currencies': record['currencies'],
+            'timestamp': record['timestamp'],
+        }))
+    return records
+
+def snapshot_from_rows(rows, days=SNAPSHOT_DAYS):
+    """Rebuild the ``{"historical_data": [...]}`` structure index.html reads from flattened rows"""
+    by_date = {}
+    for date, record in records_from_rows(rows):
+        by_date.setdefault(date, []).append(record)
+    return {"historical_data": [{'date': date, 'rates': by_date[date]} for date in sorted(by_date, reverse=True)[:days]]}
+
+def history_records(snapshot_path=SNAPSHOT_PATH):
+    """``(date, record)`` pairs from the dashboard snapshot, then the whole journal, for migrations"""
+    from rate_journal import RateJournal
+
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        for entry in reversed(data.get('historical_data', [])):
+            for record in entry['rates']:
+                yield entry['date'], record
+    yield from RateJournal().entries(since='0000-00-00')
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to a temporary file next to ``path`` and rename it into place.
+
+    Readers (the dashboard, a concurrent run) see either the old file or the
+    new one, never a half-written file.
+    """
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, suffix='.tmp', delete=False) as file:
+        try:
+            json.dump(data, file, indent=indent)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.replace(file.name, path)
+
+@contextmanager
+def store_lock(path=LOCK_PATH):
+    """Exclusive lock held across a commit so concurrent runs cannot interleave writes"""
+    try:
+        import fcntl
+    except ImportError:
+        # No flock on Windows; runs there are expected to be sequential
+        yield
+        return
+
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def open_store(name=DEFAULT_STORE, **kwargs):
+    if name not in STORES:
+        raise ValueError(f"Unknown rate store '{name}'. Known stores: {', '.join(STORES)}")
+    module_name, class_name = STORES[name]
+    return getattr(importlib.import_module(module_name), class_name)(**kwargs)
+
+def save_rates(records, store=DEFAULT_STORE):
+    """Store ``records``, refresh the dashboard snapshot and the rollups as one locked commit; False on failure"""
+    from retention import update_rollups
+
+    try:
+        date = datetime.now().strftime('%Y-%m-%d')
+        with store_lock():
+            rate_store = open_store(store)
+            try:
+                if rate_store.empty():
+                    # First run on this backend: carry the existing history over before exporting from it
+                    logging.info(f"Seeding the empty {rate_store.name} store from the existing history")
+                    rate_store.import_history()
+                rate_store.save(records, date)
+                rate_store.export_snapshot()
+                update_rollups(records, date, rate_store)
+            finally:
+                rate_store.close()
+        return True
+    except Exception as e:
+        logging.error(f"Error saving rates: {str(e)}")
+        logging.exception("Full traceback:")
+        return False
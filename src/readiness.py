@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Readiness conditions for Selenium scrapers.
+
+Each condition is a callable taking the driver, usable with WebDriverWait,
+that turns truthy as soon as the data a scraper needs is on the page, so
+extraction never waits on a fixed sleep.
+"""
+import logging
+import time
+
+ROW_WITH_RATE_JS = """
+const [selector, currency, columns, currencyColumn] = arguments;
+const isRate = text => /^\\s*[\\d,]*\\d\\.\\d+\\s*$/.test(text);
+for (const table of document.querySelectorAll(selector)) {
+    for (const row of table.rows) {
+        const cells = Array.from(row.cells, cell => cell.textContent.trim());
+        const label = currencyColumn === null ? cells.join(' ') : (cells[currencyColumn] || '');
+        if (!label.toUpperCase().includes(currency)) continue;
+        const candidates = columns === null ? cells : columns.map(i => cells[i] || '');
+        if (candidates.some(isRate)) return true;
+    }
+}
+return false;
+"""
+
+# Share of a bounded attempt the page load may use; the readiness wait gets the rest
+PAGE_LOAD_SHARE = 0.6
+
+XHR_COMPLETE_JS = """
+const pattern = arguments[0];
+return performance.getEntriesByType('resource').some(entry =>
+    (entry.initiatorType === 'xmlhttprequest' || entry.initiatorType === 'fetch') &&
+    entry.name.includes(pattern) && entry.responseEnd > 0);
+"""
+
+class row_with_rate:
+    """A row in a table matching ``selector`` mentions ``currency`` and has a
+    numeric rate in one of ``columns`` (any cell when None)"""
+
+    def __init__(self, selector, currency='USD', columns=None, currency_column=None):
+        self.selector = selector
+        self.currency = currency
+        self.columns = columns
+        self.currency_column = currency_column
+
+    def __call__(self, driver):
+        return driver.execute_script(
+            ROW_WITH_RATE_JS, self.selector, self.currency, self.columns, self.currency_column
+        )
+
+class xhr_complete:
+    """An XHR/fetch request whose URL contains ``pattern`` has finished"""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def __call__(self, driver):
+        return driver.execute_script(XHR_COMPLETE_JS, self.pattern)
+
+class network_idle:
+    """The document has loaded and no new resource has been fetched for ``idle_seconds``"""
+
+    def __init__(self, idle_seconds=0.5):
+        self.idle_seconds = idle_seconds
+        self.last_count = None
+        self.since = None
+
+    def __call__(self, driver):
+        state, count = driver.execute_script(
+            "return [document.readyState, performance.getEntriesByType('resource').length];"
+        )
+        now = time.monotonic()
+        if count != self.last_count:
+            self.last_count = count
+            self.since = now
+            return False
+        return state == 'complete' and now - self.since >= self.idle_seconds
+
+class all_of:
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def __call__(self, driver):
+        return all(condition(driver) for condition in self.conditions)
+
+class any_of:
+    def __init__(self, *conditions):
+        self.conditions = conditions
+
+    def __call__(self, driver):
+        return any(condition(driver) for condition in self.conditions)
+
+def wait_until_ready(driver, condition, timeout, poll_frequency=0.1):
+    """Block until ``condition`` holds; raises Selenium's TimeoutException otherwise"""
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+
+def load_until_ready(driver, url, condition, timeout=None, load_timeout=None, ready_timeout=15):
+    """Open ``url`` and wait for ``condition`` inside one ``timeout`` shared by both waits.
+
+    ``timeout`` is the attempt's slice of the RunDeadline. The page load may
+    use PAGE_LOAD_SHARE of it and the readiness wait gets whatever is left,
+    so a slow page cannot spend the bank's budget twice. A page load that
+    runs out still falls through to the readiness check, since rate tables
+    usually render before every resource has finished. Without ``timeout``
+    (unbounded run) each wait keeps the scraper's own defaults.
+    """
+    from selenium.common.exceptions import TimeoutException
+
+    if timeout is None:
+        if load_timeout:
+            driver.set_page_load_timeout(load_timeout)
+        driver.get(url)
+        return wait_until_ready(driver, condition, ready_timeout)
+
+    started = time.monotonic()
+    driver.set_page_load_timeout(max(1, timeout * PAGE_LOAD_SHARE))
+    try:
+        driver.get(url)
+    except TimeoutException:
+        logging.info(f"Page load of {url} used its share of the timeout, checking the page as it is")
+    return wait_until_ready(driver, condition, max(0.1, timeout - (time.monotonic() - started)))
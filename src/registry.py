@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import importlib
+import json
+import os
+
+from direct_endpoint import load_endpoints
+
+MANIFEST_PATH = os.path.join(os.path.dirname(__file__), 'scrapers.json')
+URLS_PATH = os.path.join(os.path.dirname(__file__), 'bank_urls.json')
+
+TRANSPORTS = ('http', 'pdf', 'browser')
+
+class ScraperSpec:
+    """Manifest entry for one bank; the scraper module is imported on first load()"""
+
+    def __init__(self, name, module, class_name, transport, url_key=None, enabled=True, cost=None,
+                 resource_policy=None, endpoint=None, options=None, table=None):
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unknown transport '{transport}' for {name}")
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.transport = transport
+        self.url_key = url_key
+        self.enabled = enabled
+        self.cost = cost or {}
+        self.resource_policy = resource_policy  # Browser only; see browser_policy.py
+        self.endpoint = endpoint  # Discovered plain-HTTP request; see direct_endpoint.py
+        self.options = options or {}  # Scraper-specific settings, read by the scraper itself
+        self.table = table  # Declarative rate-table layout; see table_spec.py
+        self._url = None
+        self._scraper_class = None
+
+    @property
+    def needs_browser(self):
+        return self.transport == 'browser'
+
+    @property
+    def expected_seconds(self):
+        return self.cost.get('expected_seconds')
+
+    def url(self):
+        """This bank's entry in bank_urls.json, read once per spec"""
+        if self._url is None and self.url_key:
+            with open(URLS_PATH, 'r', encoding='utf-8') as file:
+                self._url = json.load(file).get(self.url_key)
+        return self._url
+
+    def load(self):
+        """Import the scraper module and return its class"""
+        if self._scraper_class is None:
+            module = importlib.import_module(self.module)
+            self._scraper_class = getattr(module, self.class_name)
+        return self._scraper_class
+
+class ScraperRegistry:
+    """All known scrapers, read from scrapers.json without importing any of them"""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.specs = {}
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+        endpoints = load_endpoints()
+
+        for name, entry in manifest.items():
+            self.register(
+                name,
+                module=entry['module'],
+                class_name=entry['class'],
+                transport=entry['transport'],
+                url_key=entry.get('url_key'),
+                enabled=entry.get('enabled', True),
+                cost=entry.get('cost'),
+                resource_policy=entry.get('resource_policy'),
+                endpoint=endpoints.get(name),
+                options=entry.get('options'),
+                table=entry.get('table'),
+            )
+
+    def register(self, name, **kwargs):
+        self.specs[name] = ScraperSpec(name, **kwargs)
+
+    def get(self, name):
+        if name not in self.specs:
+            raise KeyError(f"No scraper registered for '{name}'. Known banks: {', '.join(sorted(self.specs))}")
+        return self.specs[name]
+
+    def select(self, names=None):
+        """Specs for the requested banks, or every enabled bank when ``names`` is None"""
+        if names is None:
+            return [spec for spec in self.specs.values() if spec.enabled]
+        return [self.get(name) for name in names]
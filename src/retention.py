@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Tiered retention: precomputed daily, weekly and monthly rate rollups.
+
+Full-resolution records stay in the rate store and the 15-day dashboard
+snapshot. For longer ranges, every run also folds its TT buy rates into
+``rate_rollups.json``, one open/close/min/max/mean bucket per bank,
+currency and period:
+
+    daily     one bucket per day, kept for RETENTION['daily'] days
+    weekly    one bucket per ISO week (keyed by its Monday), kept for RETENTION['weekly'] weeks
+    monthly   one bucket per month, kept forever
+
+Updates are incremental: a run only touches the current day, week and
+month buckets, and buckets that age out of their tier are dropped. Long
+range charts and queries read these small tables instead of the raw
+history.
+
+    python src/retention.py rebuild [--store sqlite]  # recompute from the rate store's history
+    python src/retention.py query HSBC --since 2024-01-01
+"""
+import argparse
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+
+from rate_store import DEFAULT_STORE, STORES, open_store, write_json_atomic
+
+ROLLUPS_PATH = os.path.join(os.path.dirname(__file__), 'rate_rollups.json')
+
+# Periods kept per tier; None keeps every period
+RETENTION = {
+    'daily': 90,
+    'weekly': 104,
+    'monthly': None,
+}
+
+# Rolled up for every currency a bank publishes
+ROLLUP_RATE_TYPE = 'tt_buy'
+
+# Bucket layout, stored as a list to keep the file small
+FIELDS = ('open', 'close', 'min', 'max', 'mean', 'count', 'last')
+
+def period_start(tier, day):
+    """Key of the ``tier`` bucket holding ``day`` (YYYY-MM-DD)"""
+    if tier == 'daily':
+        return day
+    if tier == 'weekly':
+        moment = date.fromisoformat(day)
+        return (moment - timedelta(days=moment.weekday())).isoformat()
+    return day[:7]
+
+def retention_cutoff(tier, today):
+    """Oldest period key ``tier`` keeps as of ``today``, or None to keep everything"""
+    periods = RETENTION[tier]
+    if periods is None:
+        return None
+    moment = date.fromisoformat(today)
+    if tier == 'daily':
+        return (moment - timedelta(days=periods - 1)).isoformat()
+    return period_start(tier, (moment - timedelta(weeks=periods - 1)).isoformat())
+
+def parse_timestamp(text):
+    """Comparable datetime for a record timestamp: naive local time, whatever format the store kept"""
+    moment = datetime.fromisoformat(text[:-1] + '+00:00' if text.endswith('Z') else text)
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+def observations(day, record):
+    """``(currency, rate, timestamp)`` for each rolled-up rate in a record"""
+    currencies = dict(record.get('currencies') or {})
+    currencies['USD'] = dict(currencies.get('USD', {}), **{ROLLUP_RATE_TYPE: record['tt_buy_rate']})
+    return [
+        (currency, float(rates[ROLLUP_RATE_TYPE]), record['timestamp'])
+        for currency, rates in currencies.items()
+        if rates.get(ROLLUP_RATE_TYPE) is not None
+    ]
+
+class RateRollups:
+    """Open/close/min/max/mean per bank, currency and period for each retention tier"""
+
+    def __init__(self, path=ROLLUPS_PATH):
+        self.path = path
+        self.tiers = {tier: {} for tier in RETENTION}
+        try:
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as file:
+                    data = json.load(file)
+                for tier in RETENTION:
+                    self.tiers[tier] = data.get('tiers', {}).get(tier, {})
+        except Exception as e:
+            logging.warning(f"Could not read {os.path.basename(path)}, starting empty: {str(e)}")
+
+    def add(self, day, record):
+        """Fold one record into the buckets of every tier; a record already counted is skipped"""
+        for currency, rate, timestamp in observations(day, record):
+            moment = parse_timestamp(timestamp)
+            for tier, banks in self.tiers.items():
+                periods = banks.setdefault(record['bank'], {}).setdefault(currency, {})
+                key = period_start(tier, day)
+                bucket = periods.get(key)
+                if bucket is None:
+                    periods[key] = [rate, rate, rate, rate, rate, 1, timestamp]
+                    continue
+                if moment <= parse_timestamp(bucket[6]):
+                    # Replays of an earlier run (rebuilds, overlapping sources) must not count twice
+                    continue
+                count = bucket[5] + 1
+                bucket[1] = rate
+                bucket[2] = min(bucket[2], rate)
+                bucket[3] = max(bucket[3], rate)
+                bucket[4] = round(bucket[4] + (rate - bucket[4]) / count, 6)
+                bucket[5] = count
+                bucket[6] = timestamp
+
+    def prune(self, today=None):
+        """Drop buckets that have aged out of their tier"""
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        for tier, banks in self.tiers.items():
+            cutoff = retention_cutoff(tier, today)
+            if cutoff is None:
+                continue
+            for currencies in banks.values():
+                for currency, periods in currencies.items():
+                    currencies[currency] = {key: bucket for key, bucket in periods.items() if key >= cutoff}
+
+    def update(self, records, date=None):
+        """Fold a run's records in under ``date`` (default today), prune and save"""
+        day = date or datetime.now().strftime('%Y-%m-%d')
+        for record in records:
+            self.add(day, record)
+        self.prune(day)
+        self.save()
+
+    def save(self):
+        data = {'fields': list(FIELDS), 'retention': RETENTION, 'tiers': self.tiers}
+        write_json_atomic(self.path, data, indent=None)
+
+    def tier_for(self, start, today=None):
+        """Finest tier that still holds ``start`` (YYYY-MM-DD)"""
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        for tier in RETENTION:
+            cutoff = retention_cutoff(tier, today)
+            if cutoff is None or (start and start >= cutoff):
+                return tier
+        return 'monthly'
+
+    def series(self, bank, currency='USD', start=None, end=None, tier=None):
+        """``(period, open, close, min, max, mean)`` rows, oldest first.
+
+        Without ``tier``, picks the finest tier whose retention still covers
+        ``start``, so a multi-year query reads the monthly table.
+        """
+        tier = tier or self.tier_for(start)
+        first = period_start(tier, start) if start else None
+        periods = self.tiers[tier].get(bank, {}).get(currency, {})
+        return [
+            (key, *bucket[:5])
+            for key, bucket in sorted(periods.items())
+            if (first is None or key >= first) and (not end or key <= end)
+        ]
+
+    def rebuild(self, rate_store):
+        """Recompute every tier from the whole history of ``rate_store``"""
+        self.tiers = {tier: {} for tier in RETENTION}
+        records = sorted(rate_store.records(), key=lambda entry: (entry[0], parse_timestamp(entry[1]['timestamp'])))
+        for day, record in records:
+            self.add(day, record)
+        self.prune()
+        self.save()
+
+def update_rollups(records, date, rate_store):
+    """Fold a run into the rollups; they are derived data, so a failure is only logged"""
+    try:
+        rollups = RateRollups()
+        if not os.path.exists(rollups.path):
+            # First run with retention: backfill from the store's history, which already includes this run
+            rollups.rebuild(rate_store)
+            return
+        rollups.update(records, date)
+    except Exception as e:
+        logging.warning(f"Could not update rate rollups "
+                        f"(rebuild with 'python src/retention.py rebuild --store {rate_store.name}'): {str(e)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or query the precomputed rate rollups")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    rebuild = subparsers.add_parser('rebuild', help="Recompute rate_rollups.json from a rate store's history")
+    rebuild.add_argument('--store', choices=sorted(STORES), default=DEFAULT_STORE)
+    query = subparsers.add_parser('query', help="Print one bank's rollup series")
+    query.add_argument('bank')
+    query.add_argument('--currency', default='USD')
+    query.add_argument('--since', help="First date (YYYY-MM-DD); picks the tier")
+    query.add_argument('--until', help="Last date (YYYY-MM-DD)")
+    query.add_argument('--tier', choices=list(RETENTION))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    rollups = RateRollups()
+    if args.command == 'rebuild':
+        rate_store = open_store(args.store)
+        try:
+            rollups.rebuild(rate_store)
+        finally:
+            rate_store.close()
+        logging.info(f"Rebuilt {os.path.basename(rollups.path)} from the {args.store} store")
+        return
+
+    for period, open_, close, low, high, mean in rollups.series(args.bank, args.currency, args.since, args.until,
+                                                                 args.tier):
+        print(f"{period}  open {open_:.4f}  close {close:.4f}  min {low:.4f}  max {high:.4f}  mean {mean:.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+import logging
+import random
+import time
+
+def classify_failure(exc=None):
+    """Map a failed attempt to a failure kind.
+
+    ``timeout``  the page or request took too long
+    ``network``  connection problems and retryable HTTP statuses (429, 5xx)
+    ``empty``    the scraper ran but returned no rate (``exc`` is None)
+    ``error``    anything else, e.g. a 404 or a bug in the scraper
+    """
+    if exc is None:
+        return 'empty'
+
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    # Also matches asyncio.TimeoutError, httpx.ReadTimeout and Selenium's TimeoutException
+    if isinstance(exc, TimeoutError) or any('Timeout' in name for name in names):
+        return 'timeout'
+
+    status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    if status is not None:
+        return 'network' if status == 429 or status >= 500 else 'error'
+
+    if isinstance(exc, ConnectionError) or names & {'TransportError', 'RequestException', 'WebDriverException'}:
+        return 'network'
+
+    return 'error'
+
+class RetryPolicy:
+    """How many times to try a bank and which failures are worth retrying"""
+
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=10.0, retry_on=('timeout', 'network')):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = set(retry_on)
+
+    def delay(self, attempt):
+        """Exponential backoff with full jitter for the given 0-based attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def next_delay(self, kind, attempt, deadline=None):
+        """Seconds to wait before the next attempt, or None to give up"""
+        if kind not in self.retry_on or attempt + 1 >= self.attempts:
+            return None
+
+        delay = self.delay(attempt)
+        remaining = deadline.remaining() if deadline else None
+        if remaining is not None and remaining <= delay:
+            return None
+        return delay
+
+def run_with_retry(attempt_fn, policy, label, deadline=None):
+    """Call ``attempt_fn()`` until it returns a result or the policy gives up"""
+    for attempt in range(policy.attempts):
+        exc = None
+        try:
+            result = attempt_fn()
+            if result:
+                return result
+        except Exception as e:
+            exc = e
+
+        kind = classify_failure(exc)
+        delay = policy.next_delay(kind, attempt, deadline)
+        if delay is None:
+            if exc is not None:
+                raise exc
+            return None
+
+        logging.warning(f"{label}: attempt {attempt + 1} failed ({kind}), retrying in {delay:.1f}s")
+        time.sleep(delay)
+
+async def run_with_retry_async(attempt_fn, policy, label, deadline=None):
+    """Async counterpart of run_with_retry for coroutine attempts"""
+    import asyncio
+
+    for attempt in range(policy.attempts):
+        exc = None
+        try:
+            result = await attempt_fn()
+            if result:
+                return result
+        except Exception as e:
+            exc = e
+
+        kind = classify_failure(exc)
+        delay = policy.next_delay(kind, attempt, deadline)
+        if delay is None:
+            if exc is not None:
+                raise exc
+            return None
+
+        logging.warning(f"{label}: attempt {attempt + 1} failed ({kind}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+async def hedged(attempt_fn, hedge_after, label):
+    """Run ``attempt_fn()``, firing a second copy if the first is still
+    running after ``hedge_after`` seconds. The first successful result wins
+    and the other attempt is cancelled.
+    """
+    import asyncio
+
+    first = asyncio.ensure_future(attempt_fn())
+    if hedge_after is None:
+        return await first
+
+    done, _ = await asyncio.wait({first}, timeout=hedge_after)
+    if done:
+        return first.result()
+
+    logging.info(f"{label}: no response after {hedge_after:.1f}s, sending hedged request")
+    pending = {first, asyncio.ensure_future(attempt_fn())}
+    failure = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    failure = failure or task.exception()
+                elif task.result():
+                    return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if failure is not None:
+        raise failure
+    return None
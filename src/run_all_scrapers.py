@@ -1,22 +1,19 @@
 #!/usr/bin/env python3
 import logging
-import importlib
-import os
-import json
-from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
-from rich.console import Console
-from rich.live import Live
-from rich.table import Table
-from rich.panel import Panel
-from rich import box
 import signal
 import sys
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from retry import RetryPolicy, run_with_retry, run_with_retry_async, hedged
 
-console = Console()
+_console = None
+
+def get_console():
+    """Rich console, created on first use so importing this module stays cheap"""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
 
 class BankStatus:
     def __init__(self, banks):
@@ -29,6 +26,10 @@ class BankStatus:
             self.rates[bank] = rate
 
     def get_table(self):
+        from rich.table import Table
+        from rich.panel import Panel
+        from rich import box
+
         table = Table(box=box.ROUNDED)
         table.add_column("Bank", style="cyan")
         table.add_column("Status", style="magenta")
@@ -51,36 +52,48 @@ class BankStatus:
 
         return Panel(table, title="Forex Rate Scraper Status", border_style="blue")
 
-def get_scraper_class_name(bank):
-    """Get the correct scraper class name for a bank"""
-    if bank == 'iob':
-        return 'IOBScraper'
-    elif bank == 'canara':
-        return 'CanaraScraper'
-    elif bank == 'kotak':
-        return 'KotakScraper'
-    elif bank == 'icici':
-        return 'ICICIScraper'
-    elif bank == 'hsbc':
-        return 'HSBCScraper'
-    elif bank == 'sbi':
-        return 'SBIScraper'
-    else:
-        return f"{bank.upper()}Scraper"
+# A browser scraper returning nothing almost always means the rate table
+# did not render in time, so browser banks also retry on empty results
+BROWSER_RETRY_POLICY = RetryPolicy(attempts=2, retry_on=('timeout', 'network', 'empty'))
+HTTP_RETRY_POLICY = RetryPolicy(attempts=3, retry_on=('timeout', 'network'))
 
-def run_scraper(bank, bank_status):
-    """Run a single scraper and return its result"""
+def run_selenium_scraper(spec, bank_status, driver_pool, deadline, parse_pool=None,
+                         browser_metrics=None, block_resources=True, content_cache=None):
+    """Run a single selenium scraper on a Chrome instance leased from the pool"""
+    from browser_policy import ResourcePolicy, collect_network_stats
+
+    bank = spec.name
     try:
         bank_status.update(bank, "Running")
-        module_name = f"banks.scraper_{bank}"
-        class_name = get_scraper_class_name(bank)
-
-        module = importlib.import_module(module_name)
-        scraper_class = getattr(module, class_name)
-
-        scraper = scraper_class()
-        rate = scraper.get_rate()
+        scraper_class = spec.load()
+
+        policy = ResourcePolicy.from_config(spec.resource_policy) if block_resources else None
+
+        def attempt():
+            with driver_pool.lease() as driver:
+                started = time.monotonic()
+                if policy:
+                    policy.apply(driver)
+                elif browser_metrics:
+                    driver.get_log('performance')
+                scraper = scraper_class(spec)
+                scraper.driver = driver
+                scraper.parse_pool = parse_pool
+                scraper.content_cache = content_cache
+                scraper.timeout = deadline.timeout_for(bank, spec.expected_seconds)
+                if scraper.timeout is not None:
+                    driver.set_page_load_timeout(scraper.timeout)
+
+                rate = scraper.get_rate()
+
+                if browser_metrics:
+                    browser_metrics.record(bank, collect_network_stats(driver), blocked=bool(policy))
+
+            if rate:
+                deadline.history.record(bank, time.monotonic() - started)
+            return rate
 
+        rate = run_with_retry(attempt, BROWSER_RETRY_POLICY, bank, deadline)
         if rate:
             bank_status.update(bank, "Complete", rate['tt_buy_rate'])
             return rate
@@ -89,40 +102,97 @@ def run_scraper(bank, bank_status):
             return None
 
     except Exception as e:
+        logging.error(f"Error in {bank} selenium scraper: {str(e)}")
         bank_status.update(bank, "Failed")
-        logging.error(f"Error running {bank} scraper: {str(e)}")
         return None
 
-def run_selenium_scraper(bank, bank_status):
-    """Run a single selenium scraper with its own Chrome instance"""
-    driver = None
+# Discovered endpoints are cheap to try; anything unexpected goes straight
+# to the browser fallback instead of being retried
+DIRECT_RETRY_POLICY = RetryPolicy(attempts=2, retry_on=('timeout', 'network'))
+DIRECT_EXPECTED_SECONDS = 3
+
+def run_direct_scraper(spec, deadline, parse_pool=None):
+    """Fetch a browser bank's rate from its discovered endpoint, without Chrome"""
+    from direct_endpoint import DirectEndpoint
+
+    bank = spec.name
+    # Direct and browser latencies differ by an order of magnitude, so they
+    # are tracked separately
+    history_key = f"{bank}.direct"
+    endpoint = DirectEndpoint.from_config(spec.endpoint)
+    scraper = spec.load()(spec)
+
+    def attempt():
+        started = time.monotonic()
+        timeout = deadline.timeout_for(history_key, DIRECT_EXPECTED_SECONDS)
+        rate = endpoint.get_rate(scraper, 30 if timeout is None else timeout, parse_pool)
+        if rate:
+            deadline.history.record(history_key, time.monotonic() - started)
+        return rate
+
     try:
-        bank_status.update(bank, "Running")
+        return run_with_retry(attempt, DIRECT_RETRY_POLICY, f"{bank} (direct)", deadline)
+    except Exception as e:
+        logging.warning(f"{bank} direct endpoint failed: {str(e)}")
+        return None
 
-        module_name = f"banks.scraper_{bank}"
-        class_name = get_scraper_class_name(bank)
-        module = importlib.import_module(module_name)
-        scraper_class = getattr(module, class_name)
+def run_browser_bank(spec, bank_status, driver_pool, deadline, parse_pool=None,
+                     browser_metrics=None, block_resources=True, content_cache=None):
+    """Try a browser bank's direct endpoint first, then fall back to Chrome"""
+    if spec.endpoint:
+        bank_status.update(spec.name, "Running")
+        rate = run_direct_scraper(spec, deadline, parse_pool)
+        if rate:
+            bank_status.update(spec.name, "Complete", rate['tt_buy_rate'])
+            return rate
+        logging.warning(f"{spec.name}: falling back to the browser scraper")
 
-        # Create Chrome instance
-        chrome_options = Options()
-        chrome_options.add_argument('--headless=new')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+    return run_selenium_scraper(spec, bank_status, driver_pool, deadline, parse_pool,
+                                browser_metrics, block_resources, content_cache)
 
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.set_page_load_timeout(90)
+async def run_async_scraper(spec, bank_status, engine, deadline, parse_pool=None, hedge=True, http_cache=None,
+                            content_cache=None):
+    """Run a single request-based scraper on the shared HttpEngine.
 
-        scraper = scraper_class()
-        scraper.driver = driver
+    With ``hedge`` enabled, a duplicate request is sent once an attempt has
+    run longer than the bank's historical p90 latency.
+    """
+    import asyncio
 
-        # Add a small delay before scraping
-        time.sleep(2)
+    bank = spec.name
+    try:
+        bank_status.update(bank, "Running")
+        scraper_class = spec.load()
+
+        async def fetch(timeout):
+            scraper = scraper_class(spec)
+            scraper.timeout = timeout
+            scraper.parse_pool = parse_pool
+            if hasattr(scraper, 'http_cache'):
+                scraper.http_cache = http_cache
+            scraper.content_cache = content_cache
+            if hasattr(scraper, 'get_rate_async'):
+                return await scraper.get_rate_async(engine)
+            return await asyncio.to_thread(scraper.get_rate)
+
+        async def attempt():
+            started = time.monotonic()
+            timeout = deadline.timeout_for(bank, spec.expected_seconds)
+            hedge_after = deadline.history.percentile(bank, 90) if hedge else None
+            try:
+                rate = await asyncio.wait_for(
+                    hedged(lambda: fetch(timeout), hedge_after, bank), timeout=timeout
+                )
+            except asyncio.TimeoutError:
+                if timeout is not None:
+                    logging.error(f"{bank} scraper cancelled after its {timeout:.1f}s budget")
+                raise
+
+            if rate:
+                deadline.history.record(bank, time.monotonic() - started)
+            return rate
 
-        rate = scraper.get_rate()
+        rate = await run_with_retry_async(attempt, HTTP_RETRY_POLICY, bank, deadline)
         if rate:
             bank_status.update(bank, "Complete", rate['tt_buy_rate'])
             return rate
@@ -131,15 +201,30 @@ def run_selenium_scraper(bank, bank_status):
             return None
 
     except Exception as e:
-        logging.error(f"Error in {bank} selenium scraper: {str(e)}")
         bank_status.update(bank, "Failed")
+        logging.error(f"Error running {bank} scraper: {str(e)}")
         return None
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except Exception as e:
-                logging.error(f"Error closing Chrome for {bank}: {str(e)}")
+
+def run_http_scrapers(specs, bank_status, deadline, persistence, parse_pool=None, http_cache=None,
+                      content_cache=None):
+    """Drive every request-based scraper from one event loop on this thread.
+
+    Rates are submitted to ``persistence`` as each bank finishes, so they
+    survive even if the run deadline abandons this task before the loop exits.
+    """
+    import asyncio
+    from http_engine import HttpEngine
+
+    async def run_one(spec, engine):
+        rate = await run_async_scraper(spec, bank_status, engine, deadline, parse_pool,
+                                       http_cache=http_cache, content_cache=content_cache)
+        persistence.submit(rate)
+
+    async def run_all():
+        async with HttpEngine() as engine:
+            await asyncio.gather(*(run_one(spec, engine) for spec in specs))
+
+    asyncio.run(run_all())
 
 def cleanup_resources(executor=None, futures=None):
     """Cleanup resources and connections"""
@@ -153,11 +238,23 @@ def cleanup_resources(executor=None, futures=None):
 
 def signal_handler(signum, frame):
     """Handle interrupt signals"""
-    console.print("\n[red]Received interrupt signal. Cleaning up...[/red]")
+    get_console().print("\n[red]Received interrupt signal. Cleaning up...[/red]")
     cleanup_resources()
     sys.exit(1)
 
-def run_all_scrapers():
+def run_all_scrapers(budget=None, banks=None, parse_workers=0, block_resources=True, use_http_cache=True,
+                     use_content_cache=True, store=None):
+    # Everything else is imported here, so importing this module stays within its budget
+    from browser_policy import BrowserMetrics
+    from content_cache import ContentCache
+    from deadline import RunDeadline
+    from http_cache import HttpCache
+    from persistence import PersistenceQueue
+    from rate_store import DEFAULT_STORE
+    from registry import ScraperRegistry
+    from scheduler import Scheduler
+    from selector_cache import SelectorCache
+
     # Register signal handlers
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -168,135 +265,143 @@ def run_all_scrapers():
         format='%(asctime)s - %(levelname)s - %(message)s'
     )
 
-    # Separate scrapers by type
-    selenium_scrapers = ['kotak', 'iob', 'idfc']  # Selenium-based scrapers
-    request_scrapers = [
-        'sbi',
-        'canara',
-        'hsbc',
-        'icici',
-    ]  # Request-based scrapers
+    # Separate scrapers by type; nothing is imported until it is scheduled
+    specs = ScraperRegistry().select(banks)
+    selenium_specs = [spec for spec in specs if spec.needs_browser]
+    request_specs = [spec for spec in specs if not spec.needs_browser]
 
     # Initialize bank status tracker
-    bank_status = BankStatus(selenium_scrapers + request_scrapers)
-
-    results = []
-    executor = None
-    futures = []
+    bank_status = BankStatus([spec.name for spec in specs])
+
+    # Learned table locations leave the records before they are stored
+    selector_cache = SelectorCache()
+    # The only writer of rate history for this run; committed once when the run ends
+    store = store or DEFAULT_STORE
+    persistence = PersistenceQueue(store, prepare=selector_cache.learn).start()
+    driver_pool = None
+    browser_metrics = None
+    parse_pool = None
+    deadline = RunDeadline(budget)
+    # Unchanged pages and PDFs are answered from the previous run's parse
+    http_cache = HttpCache() if use_http_cache else None
+    # Identical payloads (pages, PDFs, rendered tables) reuse the last parse
+    content_cache = ContentCache() if use_content_cache else None
+
+    # Optionally ship HTML/PDF parsing to worker processes
+    if parse_workers:
+        from parse_pool import ParsePool
+        parse_pool = ParsePool(parse_workers).start()
+
+    # One queue for every bank: browser jobs only wait on the Chrome warm-up
+    # task, and all HTTP banks share a single event loop and connection pool
+    scheduler = Scheduler({
+        'setup': 1,
+        'browser': max(1, len(selenium_specs)),
+        'http': 1,
+    })
+    if selenium_specs:
+        from driver_pool import DriverPool
+        # Banks with a discovered endpoint usually never need Chrome, so only
+        # the others get a pre-launched driver; fallbacks launch on demand
+        driver_pool = DriverPool(size=len(selenium_specs))
+        browser_metrics = BrowserMetrics()
+        browser_only = [spec for spec in selenium_specs if not spec.endpoint]
+        if browser_only:
+            scheduler.add('chrome_warmup', driver_pool.start, len(browser_only), resource='setup')
+        for spec in selenium_specs:
+            depends_on = [] if spec.endpoint else ['chrome_warmup']
+            scheduler.add(spec.name, run_browser_bank, spec, bank_status, driver_pool, deadline, parse_pool,
+                          browser_metrics, block_resources, content_cache, resource='browser',
+                          depends_on=depends_on)
+    if request_specs:
+        scheduler.add('http_banks', run_http_scrapers, request_specs, bank_status, deadline, persistence, parse_pool,
+                      http_cache, content_cache, resource='http')
+
+    from rich.live import Live
 
     try:
-        with Live(bank_status.get_table(), refresh_per_second=4) as live:
-            # Run Selenium-based scrapers in parallel
-            with ThreadPoolExecutor(max_workers=len(selenium_scrapers)) as selenium_executor:
-                selenium_futures = {
-                    selenium_executor.submit(run_selenium_scraper, bank, bank_status): bank
-                    for bank in selenium_scrapers
-                }
-
-                for future in as_completed(selenium_futures):
-                    bank = selenium_futures[future]
-                    try:
-                        rate = future.result()
-                        if rate:
-                            results.append(rate)
-                        live.update(bank_status.get_table())
-                    except Exception as e:
-                        logging.error(f"Error running {bank} scraper: {str(e)}")
-                        bank_status.update(bank, "Failed")
-                        live.update(bank_status.get_table())
-
-            # Run request-based scrapers in parallel
-            with ThreadPoolExecutor(max_workers=len(request_scrapers)) as request_executor:
-                request_futures = {
-                    request_executor.submit(run_scraper, bank, bank_status): bank
-                    for bank in request_scrapers
-                }
-
-                for future in as_completed(request_futures):
-                    bank = request_futures[future]
-                    try:
-                        rate = future.result()
-                        if rate:
-                            results.append(rate)
-                        live.update(bank_status.get_table())
-                    except Exception as e:
-                        logging.error(f"Error running {bank} scraper: {str(e)}")
-                        bank_status.update(bank, "Failed")
-                        live.update(bank_status.get_table())
+        with Live(get_renderable=bank_status.get_table, refresh_per_second=4) as live:
+            def on_complete(name, result):
+                if name == 'http_banks':
+                    for spec in request_specs:
+                        if bank_status.status[spec.name] in ("Pending", "Running"):
+                            bank_status.update(spec.name, "Failed")
+                elif name in bank_status.status:
+                    if result:
+                        persistence.submit(result)
+                    elif bank_status.status[name] != "Failed":
+                        bank_status.update(name, "Failed")
+                live.refresh()
+
+            scheduler.run(on_complete, deadline)
 
     except Exception as e:
         logging.error(f"Unexpected error: {str(e)}")
         logging.exception("Full traceback:")
     finally:
-        cleanup_resources(executor, futures)
+        cleanup_resources()
+        # Quitting the pooled drivers also aborts any browser scrape
+        # abandoned by the run deadline
+        if driver_pool:
+            driver_pool.shutdown()
+            browser_metrics.save()
+        if parse_pool:
+            parse_pool.shutdown()
+        deadline.history.save()
+        # Commits every rate in one write, before the caches below are saved
+        results = persistence.close()
+        selector_cache.save()
+        if http_cache:
+            http_cache.save()
+        if content_cache:
+            content_cache.save()
 
     # Final status display
-    console.print("\n")
-    console.print(bank_status.get_table())
+    get_console().print("\n")
+    get_console().print(bank_status.get_table())
 
     # Show final results
     if results:
-        save_rates_to_json(results)
-        console.print("\n[green]Rates collected and saved to all_banks_data.json[/green]")
-        console.print("\nRates:", results)
+        if persistence.committed:
+            get_console().print(f"\n[green]Rates stored ({store}) and saved to all_banks_data.json[/green]")
+        for rate in results:
+            get_console().print(f"  {rate['bank']}: {rate['tt_buy_rate']} "
+                                f"({len(rate.get('currencies', {}))} currencies)")
     else:
-        console.print("\n[red]No rates were collected[/red]")
+        get_console().print("\n[red]No rates were collected[/red]")
 
     # Final cleanup
     cleanup_resources()
 
-def save_rates_to_json(rates):
-    """Save all rates to JSON file with 15 day retention"""
-    json_path = os.path.join(os.path.dirname(__file__), 'all_banks_data.json')
-
-    try:
-        # Initialize or load existing data
-        all_data = {"historical_data": []}
-        if os.path.exists(json_path):
-            with open(json_path, 'r', encoding='utf-8') as file:
-                all_data = json.load(file)
-
-        # Get today's date
-        current_date = datetime.now().strftime('%Y-%m-%d')
-
-        # Find or create today's entry
-        today_entry = None
-        for entry in all_data["historical_data"]:
-            if entry["date"] == current_date:
-                today_entry = entry
-                break
-
-        if not today_entry:
-            today_entry = {"date": current_date, "rates": []}
-            all_data["historical_data"].append(today_entry)
-
-        # Update rates for today
-        for rate in rates:
-            rate_updated = False
-            for existing_rate in today_entry["rates"]:
-                if existing_rate["bank"] == rate["bank"]:
-                    existing_rate.update(rate)
-                    rate_updated = True
-                    break
-
-            if not rate_updated:
-                today_entry["rates"].append(rate)
-
-        # Sort by date (newest first) and keep only last 15 days
-        all_data["historical_data"].sort(
-            key=lambda x: x["date"],
-            reverse=True
-        )
-        all_data["historical_data"] = all_data["historical_data"][:15]
-
-        # Save to file
-        with open(json_path, 'w', encoding='utf-8') as file:
-            json.dump(all_data, file, indent=2)
-
-        logging.info(f"Saved {len(rates)} rates for {current_date}")
-
-    except Exception as e:
-        logging.error(f"Error saving to JSON: {str(e)}")
-
 if __name__ == "__main__":
-    run_all_scrapers()
+    import argparse
+    from rate_store import DEFAULT_STORE, STORES
+    from registry import ScraperRegistry
+
+    parser = argparse.ArgumentParser(description="Scrape USD-INR TT buy rates from all banks")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="Total run budget in seconds; per-bank timeouts are derived from historical p95 latency")
+    parser.add_argument('--banks', type=lambda value: [bank.strip() for bank in value.split(',') if bank.strip()],
+                        default=None, help="Comma-separated banks to scrape (default: all enabled banks in scrapers.json)")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Parse pages and PDFs in this many worker processes (default: 0, parse in-process)")
+    parser.add_argument('--no-resource-blocking', action='store_true',
+                        help="Let Chrome load images, fonts, CSS and trackers (records an unblocked bandwidth baseline)")
+    parser.add_argument('--no-http-cache', action='store_true',
+                        help="Always download and parse pages, ignoring ETag/Last-Modified from earlier runs")
+    parser.add_argument('--no-content-cache', action='store_true',
+                        help="Parse every page even when it is byte-identical to the last successful parse")
+    parser.add_argument('--store', choices=sorted(STORES), default=DEFAULT_STORE,
+                        help=f"Where rate history is kept (default: {DEFAULT_STORE}); "
+                             "all_banks_data.json is exported from it either way")
+    args = parser.parse_args()
+
+    if args.banks:
+        known = ScraperRegistry().specs
+        unknown = [bank for bank in args.banks if bank not in known]
+        if unknown:
+            parser.error(f"unknown banks: {', '.join(unknown)} (known: {', '.join(sorted(known))})")
+
+    run_all_scrapers(budget=args.budget, banks=args.banks, parse_workers=args.parse_workers,
+                     block_resources=not args.no_resource_blocking, use_http_cache=not args.no_http_cache,
+                     use_content_cache=not args.no_content_cache, store=args.store)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class Task:
+    def __init__(self, name, fn, args, resource, depends_on):
+        self.name = name
+        self.fn = fn
+        self.args = args
+        self.resource = resource
+        self.depends_on = set(depends_on)
+
+class Scheduler:
+    """Single work queue for every scrape job.
+
+    Each task belongs to a resource class (e.g. ``browser`` or ``http``) with
+    its own concurrency limit, and may depend on other tasks by name. A task
+    is started as soon as its dependencies have finished and a slot in its
+    resource class is free, so cheap HTTP scrapes never wait behind slow
+    browser page loads.
+    """
+
+    def __init__(self, limits):
+        self.limits = dict(limits)
+        self.tasks = {}
+
+    def add(self, name, fn, *args, resource='http', depends_on=()):
+        if resource not in self.limits:
+            raise ValueError(f"Unknown resource class: {resource}")
+        self.tasks[name] = Task(name, fn, args, resource, depends_on)
+
+    def run(self, on_complete=None, deadline=None):
+        """Run all tasks and return a ``{name: result}`` dict.
+
+        ``on_complete(name, result)`` is called from the calling thread after
+        each task finishes. Failed tasks have a result of ``None``. When the
+        optional ``deadline`` (a RunDeadline) expires, tasks that have not
+        started are dropped, running ones are abandoned with a ``None``
+        result, and ``run`` returns without waiting for them.
+        """
+        for task in self.tasks.values():
+            missing = task.depends_on - set(self.tasks)
+            if missing:
+                raise ValueError(f"Task {task.name} depends on unknown tasks: {sorted(missing)}")
+
+        results = {}
+        pending = set(self.tasks)
+        finished = set()
+        running = {}
+        running_per_resource = {resource: 0 for resource in self.limits}
+
+        executor = ThreadPoolExecutor(max_workers=max(1, sum(self.limits.values())))
+        try:
+            while pending or running:
+                for name in sorted(pending):
+                    task = self.tasks[name]
+                    if not task.depends_on <= finished:
+                        continue
+                    # Checked per submit, so tasks started in this pass count against the limit
+                    if running_per_resource[task.resource] >= self.limits[task.resource]:
+                        continue
+                    pending.discard(name)
+                    running_per_resource[task.resource] += 1
+                    running[executor.submit(task.fn, *task.args)] = task
+
+                if not running:
+                    raise RuntimeError(f"Dependency cycle between tasks: {sorted(pending)}")
+
+                timeout = deadline.remaining() if deadline else None
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done and deadline and deadline.expired():
+                    abandoned = sorted(task.name for task in running.values()) + sorted(pending)
+                    logging.warning(f"Run deadline reached, abandoning: {abandoned}")
+                    for name in abandoned:
+                        results[name] = None
+                        if on_complete:
+                            on_complete(name, None)
+                    break
+
+                for future in done:
+                    task = running.pop(future)
+                    running_per_resource[task.resource] -= 1
+                    finished.add(task.name)
+
+                    try:
+                        results[task.name] = future.result()
+                    except Exception as e:
+                        logging.error(f"Error running task {task.name}: {str(e)}")
+                        results[task.name] = None
+
+                    if on_complete:
+                        on_complete(task.name, results[task.name])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Learned rate-table locations per bank.
+
+A full TableSpec scan tags its rate record with where the headline row
+was found (table index among the selector's matches, row index and the
+column each required rate was read from) and the indices of every table
+that held currency rows. Parsing may happen in worker
+processes, so the runner collects those tags from the finished records
+and is the only writer of selector_cache.json; every process reads it
+when a TableSpec is compiled.
+"""
+import json
+import logging
+import os
+
+CACHE_PATH = os.path.join(os.path.dirname(__file__), 'selector_cache.json')
+
+def load_locations(path=CACHE_PATH):
+    """``{bank: location}`` from selector_cache.json, empty when nothing was learned yet"""
+    try:
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+    except Exception as e:
+        logging.warning(f"Could not read selector cache, scanning every table: {str(e)}")
+    return {}
+
+class SelectorCache:
+    """Collects learned table locations from rate records and persists them"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = load_locations(path)
+        self.learned = 0
+
+    def learn(self, records):
+        """Move ``table_location`` tags out of ``records`` into the cache"""
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            location = record.pop('table_location', None)
+            if not location:
+                continue
+            bank = location.pop('bank')
+            if self.entries.get(bank) != location:
+                logging.info(f"Learned rate table location for {bank}: {location}")
+                self.entries[bank] = location
+                self.learned += 1
+
+    def save(self):
+        if not self.learned:
+            return
+        try:
+            with open(self.path, 'w', encoding='utf-8') as file:
+                json.dump(self.entries, file, indent=2)
+        except Exception as e:
+            logging.error(f"Error saving selector cache: {str(e)}")
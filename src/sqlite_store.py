@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""SQLite rate store.
+
+Every record is flattened to one row per (date, bank, currency, rate type)
+in ``rates.db``. The primary key doubles as the date-first index, and two
+more indexes serve per-bank and per-currency range queries, so years of
+history stay a millisecond lookup. The database runs in WAL mode so the
+dashboard export can read while a run writes, and each run's records go in
+as one batched transaction.
+
+    python src/sqlite_store.py import   # load the journal and all_banks_data.json
+    python src/sqlite_store.py export   # rewrite all_banks_data.json from rates.db
+"""
+import argparse
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+from rate_store import (SNAPSHOT_DAYS, SNAPSHOT_PATH, RateStore, history_records, record_rows, records_from_rows,
+                        snapshot_from_rows, write_json_atomic)
+
+DB_PATH = os.path.join(os.path.dirname(__file__), 'rates.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    date TEXT NOT NULL,
+    bank TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    rate_type TEXT NOT NULL,
+    rate REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    PRIMARY KEY (date, bank, currency, rate_type)
+);
+CREATE INDEX IF NOT EXISTS rates_by_bank ON rates (bank, currency, date);
+CREATE INDEX IF NOT EXISTS rates_by_currency ON rates (currency, rate_type, date);
+"""
+
+# "Update or add": a later record for the same bank and day updates each rate it carries
+UPSERT = """
+INSERT INTO rates (date, bank, currency, rate_type, rate, timestamp) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (date, bank, currency, rate_type) DO UPDATE SET rate = excluded.rate, timestamp = excluded.timestamp
+"""
+
+class SQLiteRateStore(RateStore):
+    name = 'sqlite'
+
+    def __init__(self, path=DB_PATH, snapshot_path=SNAPSHOT_PATH, snapshot_days=SNAPSHOT_DAYS):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.snapshot_days = snapshot_days
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def save(self, records, date=None):
+        date = date or datetime.now().strftime('%Y-%m-%d')
+        self.save_many((date, record) for record in records)
+
+    def save_many(self, dated_records):
+        """Upsert ``(date, record)`` pairs in a single transaction"""
+        rows = [row for date, record in dated_records for row in record_rows(date, record)]
+        with self.connection:
+            self.connection.executemany(UPSERT, rows)
+        logging.info(f"Stored {len(rows)} rates in {os.path.basename(self.path)}")
+
+    def history(self, bank=None, currency='USD', rate_type='tt_buy', start=None, end=None):
+        """``(date, bank, rate, timestamp)`` rows for one currency and rate type, oldest first"""
+        query = "SELECT date, bank, rate, timestamp FROM rates WHERE currency = ? AND rate_type = ?"
+        params = [currency, rate_type]
+        if bank:
+            query += " AND bank = ?"
+            params.append(bank)
+        if start:
+            query += " AND date >= ?"
+            params.append(start)
+        if end:
+            query += " AND date <= ?"
+            params.append(end)
+        return self.connection.execute(query + " ORDER BY date, bank", params).fetchall()
+
+    def snapshot(self, days=None):
+        """The ``{"historical_data": [...]}`` structure index.html reads, newest day first"""
+        days = days or self.snapshot_days
+        dates = [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT date FROM rates ORDER BY date DESC LIMIT ?", (days,))]
+        if not dates:
+            return {"historical_data": []}
+        rows = self.connection.execute(
+            "SELECT date, bank, currency, rate_type, rate, timestamp FROM rates WHERE date >= ?", (dates[-1],))
+        return snapshot_from_rows(rows, days)
+
+    def empty(self):
+        return self.connection.execute("SELECT 1 FROM rates LIMIT 1").fetchone() is None
+
+    def export_snapshot(self):
+        snapshot = self.snapshot()
+        if not snapshot["historical_data"]:
+            logging.warning(f"{os.path.basename(self.path)} is empty, not overwriting "
+                            f"{os.path.basename(self.snapshot_path)}; run 'python src/sqlite_store.py import' first")
+            return
+        write_json_atomic(self.snapshot_path, snapshot)
+        logging.info(f"Exported {os.path.basename(self.snapshot_path)} from {os.path.basename(self.path)}")
+
+    def import_history(self):
+        """Load the dashboard snapshot, then the whole journal on top of it"""
+        self.save_many(history_records(self.snapshot_path))
+
+    def records(self):
+        return records_from_rows(self.connection.execute(
+            "SELECT date, bank, currency, rate_type, rate, timestamp FROM rates ORDER BY date"))
+
+    def close(self):
+        # Refreshes index statistics so range queries keep picking the right index
+        self.connection.execute("PRAGMA optimize")
+        self.connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Import rate history into rates.db or export the dashboard JSON")
+    parser.add_argument('command', choices=['import', 'export'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    store = SQLiteRateStore()
+    try:
+        if args.command == 'import':
+            store.import_history()
+        else:
+            store.export_snapshot()
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
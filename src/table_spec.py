@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""Declarative rate-table extraction.
+
+Each bank's ``table`` entry in scrapers.json describes where its rates
+live instead of code walking the rows:
+
+    "table": {
+      "selector": "table.Gridview",       # see html_tables.table_rows
+      "tables": "first",                  # "all" (default), "first" or "last"
+      "cell_tags": ["td", "th"],
+      "currency_column": 1,               # null: any cell may name the currency
+      "currency_match": "exact",          # or "contains" (default)
+      "min_cells": 6,
+      "rate_columns": {"tt_buy": 4},      # index, [indices to try], or [header aliases]
+      "number_format": "plain"            # "plain", "comma" or "strip"
+    }
+
+A spec is compiled once into a row matcher. When a rate column is given
+by header aliases, the first row of each table is the header row.
+
+Every row naming a known currency is read, not only USD. The configured
+rate columns are required; any other rate type whose column header
+appears in ``RATE_HEADERS`` (TT sell, bill, card and cash rates) is picked
+up as well where the bank publishes it.
+
+A full scan records where the headline currency row was found (table,
+row and columns) and which tables held any currency rows. The runner
+persists that location in selector_cache.json, and later runs read only
+those tables, falling back to the full scan and re-learning when the
+headline row no longer validates.
+
+Browser banks do not ship HTML at all: ``extraction_script()`` compiles the
+spec into a JavaScript snippet that returns just the matched tables' cell
+texts as JSON, and ``rows_record`` applies the same matching to those rows.
+"""
+import json
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+def _plain(text):
+    return float(text)
+
+def _comma(text):
+    return float(text.replace(',', ''))
+
+def _strip(text):
+    # Keep digits and the decimal point only, e.g. "Rs. 83.10*" -> 83.10
+    return float(''.join(char for char in text if char.isdigit() or char == '.'))
+
+NUMBER_FORMATS = {'plain': _plain, 'comma': _comma, 'strip': _strip}
+
+def _normalise_header(text):
+    return re.sub(r'\s+', '', text).upper()
+
+# Currencies quoted on Indian bank forex cards
+CURRENCIES = frozenset((
+    'USD', 'EUR', 'GBP', 'JPY', 'CHF', 'AUD', 'CAD', 'SGD', 'HKD', 'NZD', 'SEK', 'DKK', 'NOK',
+    'AED', 'SAR', 'QAR', 'KWD', 'BHD', 'OMR', 'ZAR', 'THB', 'MYR', 'CNY', 'KRW', 'IDR', 'LKR',
+    'BDT', 'NPR', 'TRY', 'RUB',
+))
+CURRENCY_CODE = re.compile(r'\b[A-Z]{3}\b')
+
+# Normalised header aliases for the rate types a page may publish besides its configured columns
+RATE_HEADERS = {
+    'tt_buy': ('TTBUY',),
+    'tt_sell': ('TTSELL',),
+    'bill_buy': ('BILLBUY', 'BILLSBUY'),
+    'bill_sell': ('BILLSELL', 'BILLSSELL'),
+    'card_buy': ('CARDBUY', 'TCBUY'),
+    'card_sell': ('CARDSELL', 'TCSELL'),
+    'cash_buy': ('CASHBUY', 'NOTESBUY', 'CURRENCYBUY'),
+    'cash_sell': ('CASHSELL', 'NOTESSELL', 'CURRENCYSELL'),
+}
+
+class TableSpec:
+    """Compiled description of one bank's rate table"""
+
+    def __init__(self, selector='table', tables='all', cell_tags=('td', 'th'), currency_column=None,
+                 currency_match='contains', min_cells=0, rate_columns=None, number_format='plain', bank=None,
+                 location=None):
+        if tables not in ('all', 'first', 'last'):
+            raise ValueError(f"Unknown table choice '{tables}'")
+        if number_format not in NUMBER_FORMATS:
+            raise ValueError(f"Unknown number format '{number_format}'")
+        self.selector = selector
+        self.tables = tables
+        self.cell_tags = tuple(cell_tags)
+        self.currency_column = currency_column
+        self.currency_match = currency_match
+        self.min_cells = min_cells
+        self.parse_number = NUMBER_FORMATS[number_format]
+        self.bank = bank  # scrapers.json key, used to tag learned locations
+        self.location = location  # Learned {'table', 'row', 'currency', 'columns', 'tables'}; see selector_cache.py
+        self._script = None
+
+        # Split rate columns into fixed positions and header lookups up front
+        self.positions = {}
+        self.header_aliases = {}
+        for rate_type, column in (rate_columns or {'tt_buy': 1}).items():
+            candidates = column if isinstance(column, list) else [column]
+            if all(isinstance(candidate, int) for candidate in candidates):
+                self.positions[rate_type] = candidates
+            else:
+                self.header_aliases[rate_type] = [_normalise_header(alias) for alias in candidates]
+
+    @classmethod
+    def from_config(cls, config, **kwargs):
+        return cls(**config, **kwargs)
+
+    def extraction_script(self):
+        """JavaScript returning ``[[index, rows], ...]`` as JSON for the tables this spec scans.
+
+        Cells are the direct ``cell_tags`` children of each row, trimmed like
+        html_tables does, so both sources match identically.
+        """
+        if self._script is None:
+            pick = {'first': '.slice(0, 1)', 'last': '.slice(-1)', 'all': ''}[self.tables]
+            self._script = (
+                f"const tags = new Set({json.dumps([tag.upper() for tag in self.cell_tags])});\n"
+                f"const tables = Array.from(document.querySelectorAll({json.dumps(self.selector)}),"
+                f" (table, index) => [index, table]){pick};\n"
+                "return JSON.stringify(tables.map(([index, table]) => [index, Array.from(table.rows, row =>\n"
+                "    Array.from(row.cells).filter(cell => tags.has(cell.tagName)).map(cell => cell.textContent.trim()))]));"
+            )
+        return self._script
+
+    def browser_rows(self, driver):
+        """Matched tables from the live page as a JSON string, or None when none match"""
+        rows_json = driver.execute_script(self.extraction_script())
+        return rows_json if rows_json and rows_json != '[]' else None
+
+    def ready_condition(self, currency='USD'):
+        """Selenium wait condition: a table matching this spec shows a numeric TT buy rate for ``currency``"""
+        from readiness import row_with_rate
+
+        columns = self.positions.get('tt_buy')
+        if columns is None and self.location and self.location.get('currency') == currency:
+            # Header-based column: the learned index, else any cell of the row
+            columns = [self.location['columns']['tt_buy']] if 'tt_buy' in self.location.get('columns', {}) else None
+        return row_with_rate(self.selector, currency, columns=columns, currency_column=self.currency_column)
+
+    def _select(self, html, browser_tables=None):
+        """``(index, rows)`` for each table to scan; the index counts every selector match"""
+        from html_tables import table_rows
+
+        if browser_tables is not None:
+            # The extraction script already applied first/last
+            return browser_tables
+
+        limit = 1 if self.tables == 'first' else None
+        tables = list(enumerate(table_rows(html, self.selector, cell_tags=self.cell_tags, limit=limit)))
+        if self.tables == 'last':
+            tables = tables[-1:]
+        return tables
+
+    def _header_positions(self, header):
+        """Column indices for header-based rate columns, or None if any is missing"""
+        cells = [_normalise_header(cell) for cell in header]
+        positions = {}
+        for rate_type, aliases in self.header_aliases.items():
+            index = next((i for i, cell in enumerate(cells) if any(alias in cell for alias in aliases)), None)
+            if index is None:
+                return None
+            positions[rate_type] = [index]
+        return positions
+
+    def _optional_positions(self, header, taken):
+        """Columns of unconfigured rate types named in the header row"""
+        cells = [_normalise_header(cell) for cell in header]
+        positions = {}
+        for rate_type, aliases in RATE_HEADERS.items():
+            if rate_type in self.positions or rate_type in self.header_aliases:
+                continue
+            index = next((i for i, cell in enumerate(cells)
+                          if i not in taken and any(alias in cell for alias in aliases)), None)
+            if index is not None:
+                positions[rate_type] = [index]
+                taken.add(index)
+        return positions
+
+    def _row_currency(self, cells):
+        """The currency code a row is quoted for, or None"""
+        if self.currency_column is None:
+            candidates = cells
+        elif self.currency_column < len(cells):
+            candidates = [cells[self.currency_column]]
+        else:
+            return None
+
+        for cell in candidates:
+            cell = cell.upper()
+            if self.currency_match == 'exact':
+                if cell in CURRENCIES:
+                    return cell
+                continue
+            for code in CURRENCY_CODE.findall(cell):
+                if code in CURRENCIES:
+                    return code
+        return None
+
+    def _read_rates(self, cells, positions, optional, columns=None):
+        """Rates in one row, or None when a required column does not parse.
+
+        ``columns``, when given, receives the index each required rate was read from.
+        """
+        rates = {}
+        for rate_type, candidates in positions.items():
+            for index in candidates:
+                try:
+                    rates[rate_type] = self.parse_number(cells[index])
+                    if columns is not None:
+                        columns[rate_type] = index
+                    break
+                except (ValueError, IndexError):
+                    continue
+            else:
+                return None
+
+        # Extra columns are best effort: blanks and "-" are common for unquoted rates
+        for rate_type, (index,) in optional.items():
+            try:
+                rates[rate_type] = self.parse_number(cells[index])
+            except (ValueError, IndexError):
+                continue
+        return rates
+
+    def _read_table(self, rows, positions, matrix, currency, find_header=True):
+        """Add a table's currency rows to ``matrix``.
+
+        Returns ``(row, columns)`` for the ``currency`` row when this table
+        supplied it, else None. ``find_header=False`` means ``positions``
+        already covers the header-based rate columns.
+        """
+        if not rows:
+            return None
+        header = rows[0]
+        first_row = 0
+        if self.header_aliases:
+            if find_header:
+                found = self._header_positions(header)
+                if found is None:
+                    return None
+                positions = dict(positions, **found)
+            first_row = 1
+
+        optional = {}
+        if self._row_currency(header) is None:
+            taken = {index for candidates in positions.values() for index in candidates}
+            optional = self._optional_positions(header, taken)
+
+        found_at = None
+        for row_index in range(first_row, len(rows)):
+            cells = rows[row_index]
+            if len(cells) < self.min_cells:
+                continue
+            row_currency = self._row_currency(cells)
+            if row_currency is None or row_currency in matrix:
+                continue
+            columns = {}
+            rates = self._read_rates(cells, positions, optional, columns)
+            if rates is not None:
+                matrix[row_currency] = rates
+                if row_currency == currency:
+                    found_at = (row_index, columns)
+        return found_at
+
+    def _learned(self, html, browser_tables=None):
+        """Matrix from the learned tables alone, or None when they no longer validate"""
+        from html_tables import table_rows
+
+        location = self.location
+        indices = sorted(location['tables'])
+        if browser_tables is not None:
+            tables = [rows for index, rows in browser_tables if index in indices]
+        else:
+            tables = table_rows(html, self.selector, cell_tags=self.cell_tags, indices=indices)
+        if len(tables) != len(indices):
+            return None
+        tables = dict(zip(indices, tables))
+        rows = tables.get(location['table'])
+        if not rows or location['row'] >= len(rows):
+            return None
+
+        # Validate the headline row against exactly the learned columns
+        learned = {rate_type: [index] for rate_type, index in location['columns'].items()}
+        cells = rows[location['row']]
+        if len(cells) < self.min_cells or self._row_currency(cells) != location['currency']:
+            return None
+        if self._read_rates(cells, learned, {}) is None:
+            return None
+
+        # Other rows keep their index fallbacks; learned columns stand in for the header search
+        positions = dict(self.positions)
+        positions.update({rate_type: learned[rate_type] for rate_type in self.header_aliases})
+        matrix = {}
+        self._read_table(rows, positions, matrix, location['currency'], find_header=False)
+        for table_index in indices:
+            if table_index != location['table']:
+                self._read_table(tables[table_index], dict(self.positions), matrix, location['currency'])
+        return matrix
+
+    def _extract(self, html, currency, browser_tables=None):
+        """``(matrix, location)``; location is set only when a full scan found ``currency``"""
+        if self.location and self.location.get('currency') == currency:
+            try:
+                matrix = self._learned(html, browser_tables)
+            except (KeyError, TypeError):
+                # Written for an older spec of this bank
+                matrix = None
+            if matrix is not None:
+                return matrix, None
+            logging.info(f"Learned table location for {self.bank} no longer matches, rescanning")
+
+        matrix = {}
+        location = None
+        contributing = []
+        for table_index, rows in self._select(html, browser_tables):
+            known = len(matrix)
+            found_at = self._read_table(rows, dict(self.positions), matrix, currency)
+            if len(matrix) > known:
+                contributing.append(table_index)
+            if found_at:
+                row_index, columns = found_at
+                location = {'table': table_index, 'row': row_index, 'currency': currency, 'columns': columns}
+
+        if location:
+            location['tables'] = contributing
+        if not matrix:
+            logging.debug(f"No currency rows found in '{self.selector}' tables")
+        return matrix, location
+
+    def extract_all(self, html, currency='USD'):
+        """``{currency: {rate_type: float}}`` for every currency row in the page"""
+        return self._extract(html, currency)[0]
+
+    def extract(self, html, currency='USD'):
+        """``{rate_type: float}`` from the first row for ``currency``, or None"""
+        return self.extract_all(html).get(currency)
+
+    def rate_record(self, html, bank_name, currency='USD'):
+        """The runner's rate record, or None when ``currency`` has no TT buy rate.
+
+        ``tt_buy_rate`` is the headline rate; ``currencies`` holds every
+        rate type found for every currency on the page. After a full scan
+        the record also carries ``table_location`` for the selector cache.
+        """
+        return self._record(*self._extract(html, currency), bank_name, currency)
+
+    def rows_record(self, rows_json, bank_name, currency='USD'):
+        """Like rate_record, for the JSON returned by ``extraction_script()``"""
+        browser_tables = [(index, rows) for index, rows in json.loads(rows_json)]
+        return self._record(*self._extract(None, currency, browser_tables), bank_name, currency)
+
+    def _record(self, matrix, location, bank_name, currency):
+        if 'tt_buy' not in matrix.get(currency, {}):
+            return None
+        record = {
+            'bank': bank_name,
+            'tt_buy_rate': matrix[currency]['tt_buy'],
+            'currencies': matrix,
+            'timestamp': datetime.now().isoformat()
+        }
+        if location and self.bank:
+            # Picked up by the runner's SelectorCache; never saved with the rates
+            record['table_location'] = dict(location, bank=self.bank)
+        return record
+
+@lru_cache(maxsize=None)
+def table_spec_for(bank):
+    """Compiled TableSpec from a bank's scrapers.json entry, built once per process"""
+    from registry import ScraperRegistry
+    from selector_cache import load_locations
+
+    config = ScraperRegistry().get(bank).table
+    if not config:
+        raise KeyError(f"No table spec configured for '{bank}'")
+    return TableSpec.from_config(config, bank=bank, location=load_locations().get(bank))
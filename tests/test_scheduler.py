@@ -0,0 +1,43 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from scheduler import Scheduler
+
+def test_resource_limits_hold_when_more_tasks_are_ready():
+    lock = threading.Lock()
+    running = {'browser': 0, 'http': 0}
+    peak = {'browser': 0, 'http': 0}
+
+    def job(resource):
+        with lock:
+            running[resource] += 1
+            peak[resource] = max(peak[resource], running[resource])
+        time.sleep(0.05)
+        with lock:
+            running[resource] -= 1
+        return resource
+
+    scheduler = Scheduler({'browser': 2, 'http': 1})
+    for n in range(4):
+        scheduler.add(f'b{n}', job, 'browser', resource='browser')
+    for n in range(3):
+        scheduler.add(f'h{n}', job, 'http', resource='http')
+
+    results = scheduler.run()
+
+    assert len(results) == 7 and all(results.values())
+    assert peak == {'browser': 2, 'http': 1}
+
+def test_dependencies_run_first():
+    order = []
+    scheduler = Scheduler({'http': 4})
+    scheduler.add('second', order.append, 'second', depends_on=['first'])
+    scheduler.add('first', order.append, 'first')
+
+    scheduler.run()
+
+    assert order == ['first', 'second']